@@ -138,6 +138,36 @@ def dataset(client):
     return dataset
 
 
+@pytest.fixture
+def add_sources(client):
+    """Return a callable committing source files of workflows."""
+
+    def add(*names):
+        """Create files with the given names in one commit."""
+        sources = []
+        for name in names:
+            source = client.path / name
+            source.write_text('1')
+            sources.append(source)
+
+        client.repo.git.add('--all')
+        client.repo.index.commit('Created {0}'.format(', '.join(names)))
+        return sources
+
+    return add
+
+
+@pytest.fixture
+def run_wc(run):
+    """Return a callable counting characters of a file in a workflow."""
+
+    def count(source, output):
+        """Run ``wc -c`` with the source and the output as streams."""
+        return run(args=('run', 'wc', '-c'), stdin=source, stdout=output)
+
+    return count
+
+
 @pytest.fixture
 def dataset_responses():
     """Authentication responses."""
@@ -37,7 +37,28 @@ try:
 except NameError:  # pragma: no cover
     FileNotFoundError = IOError
 
+try:
+    from functools import cached_property
+except ImportError:  # pragma: no cover
+
+    class cached_property(object):
+        """Compute the value once and store it in the instance."""
+
+        def __init__(self, func):
+            """Wrap the function computing the value."""
+            self.func = func
+            self.__doc__ = func.__doc__
+
+        def __get__(self, instance, owner=None):
+            """Store the value in the instance."""
+            if instance is None:
+                return self
+            value = instance.__dict__[self.func.__name__] = self.func(instance)
+            return value
+
+
 __all__ = (
     'FileNotFoundError',
     'Path',
+    'cached_property',
 )
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers for files stored in the cache folder."""
+
+import os
+import tempfile
+
+
+def cache_version(schema_version):
+    """Return a key identifying renku and record versions."""
+    from renku.version import __version__
+    return '{0}-{1}'.format(__version__, schema_version)
+
+
+def write_atomic(path, data):
+    """Write data to a temporary file first to prevent partial records."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+    with os.fdopen(fd, 'w') as fp:
+        fp.write(data)
+    os.replace(tmp, str(path))
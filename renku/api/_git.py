@@ -20,15 +20,19 @@
 import itertools
 import os
 import shutil
+import subprocess
 import sys
 import tempfile
 import uuid
-from collections import defaultdict
+from bisect import bisect_left
+from collections import Counter, defaultdict
 from contextlib import contextmanager
 from email.utils import formatdate
 from itertools import zip_longest
 
 import attr
+from git import Git
+from git import Repo as BaseRepo
 
 from renku import errors
 from renku._compat import Path
@@ -88,6 +92,271 @@ def _expand_directories(paths):
             yield path
 
 
+GIT_CALLS = Counter()
+"""Count Git commands and requests sent to long-lived Git processes."""
+
+
+def _command_name(command):
+    """Return a name of the Git subcommand."""
+    if isinstance(command, str):
+        command = command.split()
+
+    args = iter(command[1:])
+    for arg in args:
+        if arg == '-c':
+            next(args, None)
+        elif not arg.startswith('-'):
+            return arg
+    return command[0]
+
+
+class CountingGit(Git):
+    """Count executed Git commands."""
+
+    def execute(self, command, *args, **kwargs):
+        """Count and execute the command."""
+        GIT_CALLS[_command_name(command)] += 1
+        return super().execute(command, *args, **kwargs)
+
+    def get_object_header(self, ref):
+        """Count requests for object headers."""
+        GIT_CALLS['cat-file --batch-check'] += 1
+        return super().get_object_header(ref)
+
+    def stream_object_data(self, ref):
+        """Count requests for object data."""
+        GIT_CALLS['cat-file --batch'] += 1
+        return super().stream_object_data(ref)
+
+
+class Repo(BaseRepo):
+    """Git repository counting executed commands."""
+
+    GitCommandWrapperType = CountingGit
+
+
+#: Git paths are always relative hence a slash marks a commit header.
+_COMMIT_CHANGES_FORMAT = '--format=/%H %P'
+
+_COMMIT_CHANGES_CHUNK_SIZE = 64 * 1024
+
+_COMMIT_AUTHORS_FORMAT = '--format=/%an%x00<%ae>'
+
+
+def _iter_tokens(process):
+    """Yield non-empty NUL-separated tokens streamed by the Git process."""
+    buffer = b''
+    chunks = iter(lambda: process.stdout.read(_COMMIT_CHANGES_CHUNK_SIZE), b'')
+
+    for chunk in itertools.chain(chunks, [b'\0']):
+        *tokens, buffer = (buffer + chunk).split(b'\0')
+
+        for token in tokens:
+            if token.startswith(b'\n'):
+                token = token[1:]
+            if token:
+                yield token.decode('utf-8', 'surrogateescape')
+
+    process.wait()
+
+
+def iter_commit_changes(repo, *revisions):
+    """Yield commit SHA, parent SHAs and changes from one Git call.
+
+    Every change is a tuple with a status (e.g. ``A``, ``M``, ``D`` or
+    ``R100``) and a tuple of paths. Renamed and copied files list the source
+    path before the destination path. Merge commits only list paths that
+    differ from all their parents.
+    """
+    process = repo.git.log(
+        '-z',
+        '--raw',
+        '--no-abbrev',
+        '-M',
+        '-c',
+        _COMMIT_CHANGES_FORMAT,
+        *revisions,
+        '--',
+        as_process=True,
+    )
+
+    commit, parents, changes = None, [], []
+    status, paths, expected = None, [], 0
+
+    for token in _iter_tokens(process):
+        if expected:
+            paths.append(token)
+            expected -= 1
+            if not expected:
+                changes.append((status, tuple(paths)))
+        elif token.startswith(':'):
+            status = token.split()[-1]
+            paths = []
+            expected = 2 if status[0] in 'RC' else 1
+        elif token.startswith('/'):
+            if commit is not None:
+                yield commit, parents, changes
+            commit, *parents = token[1:].split()
+            changes = []
+
+    if commit is not None:
+        yield commit, parents, changes
+
+
+def iter_path_authors(repo, *paths):
+    """Yield modified paths with the name and email of the commit author.
+
+    Commits modifying the given paths are read newest first from one
+    streamed ``git log --name-only`` instead of one call per path.
+    """
+    process = repo.git.log(
+        '-z',
+        '--name-only',
+        _COMMIT_AUTHORS_FORMAT,
+        '--',
+        *paths,
+        as_process=True,
+    )
+
+    author, name = None, None
+    for token in _iter_tokens(process):
+        if name is not None:
+            author, name = (name, token[1:-1]), None
+        elif token.startswith('/'):
+            name = token[1:]
+        elif author is not None:
+            yield (token, ) + author
+
+
+@attr.s
+class GitReader:
+    """Read commits and files using long-lived Git processes.
+
+    Modified paths of all commits are read from one streamed ``git log``
+    and file contents are requested from one ``git cat-file --batch``.
+    """
+
+    repo = attr.ib()
+
+    _changes = attr.ib(init=False, default=attr.Factory(dict))
+    _tips = attr.ib(init=False, default=attr.Factory(list))
+    _batch = attr.ib(init=False, default=None)
+
+    def log(self, revision='HEAD', exclude_known=False):
+        """Yield commit SHA, parent SHAs and changes from the revision."""
+        revisions = [revision]
+        if exclude_known:
+            revisions.extend('^' + tip for tip in self._tips)
+
+        for commit, parents, changes in iter_commit_changes(
+            self.repo, *revisions
+        ):
+            self._changes[commit] = {
+                paths[-1]: status
+                for status, paths in changes
+            }
+            yield commit, parents, changes
+
+        self._tips.append(self.repo.rev_parse(str(revision)).hexsha)
+
+    def changes(self, commit):
+        """Return paths modified by the commit mapped to their status.
+
+        Renamed files are only listed with their new path.
+        """
+        hexsha = getattr(commit, 'hexsha', commit)
+        if hexsha not in self._changes:
+            # Read the rest of the history at once.
+            for _ in self.log(hexsha, exclude_known=True):
+                pass
+        return self._changes[hexsha]
+
+    def read(self, revision, path):
+        """Return contents of the file in the revision."""
+        revision = getattr(revision, 'hexsha', revision)
+        path = os.path.normpath(str(path))
+
+        if self._batch is None:
+            self._batch = self.repo.git.cat_file(
+                '--batch', as_process=True, istream=subprocess.PIPE
+            )
+
+        GIT_CALLS['cat-file --batch'] += 1
+        process = self._batch
+        process.stdin.write('{0}:{1}\n'.format(revision, path).encode('utf-8'))
+        process.stdin.flush()
+
+        header = process.stdout.readline().split()
+        if len(header) != 3:
+            raise KeyError(path)
+
+        data = process.stdout.read(int(header[2]))
+        process.stdout.read(1)
+        return data
+
+    def close(self):
+        """Stop the long-lived Git process."""
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.wait()
+            self._batch = None
+
+
+@attr.s
+class PathHistory:
+    """Index commits modifying paths in the history of a revision.
+
+    The whole history is read in a single Git call instead of calling
+    ``git log <revision> -- <path>`` for every path.
+    """
+
+    reader = attr.ib()
+    revision = attr.ib()
+    """SHA of the newest indexed commit."""
+
+    commits = attr.ib(init=False, default=attr.Factory(list))
+    linear = attr.ib(init=False, default=True)
+
+    _positions = attr.ib(init=False, default=attr.Factory(dict))
+    _paths = attr.ib(
+        init=False, default=attr.Factory(lambda: defaultdict(list))
+    )
+
+    def __attrs_post_init__(self):
+        """Read the history."""
+        for position, (commit, parents,
+                       changes) in enumerate(self.reader.log(self.revision)):
+            self.commits.append(commit)
+            self._positions[commit] = position
+            self.linear = self.linear and len(parents) < 2
+
+            # Directories are modified by every commit modifying a member.
+            seen = set()
+            for path in itertools.chain.from_iterable(
+                paths for _, paths in changes
+            ):
+                while path not in seen:
+                    seen.add(path)
+                    self._paths[path].append(position)
+                    path = os.path.dirname(path) or '.'
+
+    def __contains__(self, revision):
+        """Check if the revision can be resolved using this index."""
+        return revision == self.revision or (
+            self.linear and revision in self._positions
+        )
+
+    def find_previous_commit(self, path, revision=None):
+        """Return SHA of the latest commit modifying the path."""
+        positions = self._paths.get(os.path.normpath(str(path)), [])
+        start = self._positions[revision or self.revision]
+        index = bisect_left(positions, start)
+
+        if index == len(positions):
+            raise KeyError(path)
+        return self.commits[positions[index]]
+
+
 @attr.s
 class GitCore:
     """Wrap Git client."""
@@ -97,7 +366,7 @@ class GitCore:
 
     def __attrs_post_init__(self):
         """Initialize computed attributes."""
-        from git import InvalidGitRepositoryError, Repo
+        from git import InvalidGitRepositoryError
 
         #: Create an instance of a Git repository for the given path.
         try:
@@ -146,14 +415,31 @@ class GitCore:
         from git.exc import GitCommandError
 
         attrs = defaultdict(dict)
+        if not paths:
+            return attrs
+
+        # Paths are sent to the standard input to support any number of them.
         try:
-            data = self.repo.git.check_attr('-z', '-a', '--', *paths)
-            for file, name, value in zip_longest(
-                *[iter(data.strip('\0').split('\0'))] * 3
-            ):
-                attrs[file][name] = value
+            process = self.repo.git.check_attr(
+                '--stdin',
+                '-z',
+                '-a',
+                as_process=True,
+                istream=subprocess.PIPE,
+            )
         except GitCommandError:
-            pass
+            return attrs
+
+        data, _ = process.proc.communicate(
+            ''.join(str(path) + '\0' for path in paths).encode('utf-8')
+        )
+        if process.proc.returncode != 0:
+            return attrs
+
+        for file, name, value in zip_longest(
+            *[iter(data.decode('utf-8').strip('\0').split('\0'))] * 3
+        ):
+            attrs[file][name] = value
 
         return attrs
 
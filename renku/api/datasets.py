@@ -17,23 +17,101 @@
 # limitations under the License.
 """Client for handling datasets."""
 
+import base64
+import binascii
+import hashlib
+import json
 import os
 import shutil
 import stat
 import warnings
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from configparser import NoSectionError
 from contextlib import contextmanager
-from urllib import error, parse
+from urllib import parse
 
 import attr
-import requests
 import yaml
 
 from renku import errors
-from renku._compat import Path
+from renku._compat import Path, cached_property
 from renku.models._git import GitURL
 from renku.models._jsonld import asjsonld
-from renku.models.datasets import Author, Dataset, DatasetFile, NoneType
+from renku.models.datasets import Author, Dataset, DatasetFile, \
+    DatasetSummary, NoneType
+
+from ._cache import cache_version, write_atomic
+from ._git import iter_path_authors
+
+DATASETS_INDEX_VERSION = 1
+"""Version of the stored dataset index (change it when the format changes)."""
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+"""Number of bytes read from the response before writing them to disk."""
+
+DOWNLOAD_RETRIES = 3
+"""Number of attempts to resume an interrupted download."""
+
+DOWNLOAD_TIMEOUT = 60
+"""Seconds to wait for the server to connect or send data."""
+
+
+def _signature(path):
+    """Return modification time and size identifying content of the file."""
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _expected_digest(response):
+    """Return SHA-256 digest announced by the server or ``None``."""
+    for value in response.headers.get('Digest', '').split(','):
+        algorithm, _, digest = value.strip().partition('=')
+        if algorithm.lower() == 'sha-256':
+            try:
+                return base64.b64decode(digest).hex()
+            except (binascii.Error, ValueError):
+                return None
+
+
+def _expected_size(response, offset):
+    """Return the size of the complete file or ``None`` if not known."""
+    encoding = response.headers.get('Content-Encoding', 'identity')
+    length = response.headers.get('Content-Length')
+    if encoding != 'identity' or length is None:
+        return None
+    return offset + int(length)
+
+
+def _copy(src, dst, nocopy=False):
+    """Copy the file or create a hard link if ``nocopy`` is set."""
+    if nocopy:
+        try:
+            os.link(str(src), str(dst))
+        except Exception as e:
+            raise Exception(
+                'Could not create hard link '
+                '- retry without nocopy.'
+            ) from e
+    else:
+        shutil.copy(str(src), str(dst))
+
+
+def _transfer(transfers, jobs=1):
+    """Run transfers in threads and yield their results as they finish."""
+    if jobs < 2 or len(transfers) < 2:
+        for transfer in transfers:
+            yield transfer()
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(transfer) for transfer in transfers]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
 
 
 @attr.s
@@ -51,15 +129,266 @@ class DatasetsApiMixin(object):
         """Return a ``Path`` instance of Renku dataset metadata folder."""
         return self.renku_path.joinpath(self.DATASETS)
 
+    DATASETS_INDEX = 'datasets.json'
+    """Name of the cached index of dataset summaries."""
+
+    DATASET_FILES = 'dataset-files'
+    """Directory in the cache folder for lists of files in datasets."""
+
+    DOWNLOADS = 'downloads'
+    """Directory in the cache folder for partially downloaded files."""
+
+    @cached_property
+    def http_session(self):
+        """Return a session reusing connections of all downloads."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            max_retries=Retry(
+                total=DOWNLOAD_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=(500, 502, 503, 504),
+                raise_on_status=False,
+            )
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def download(self, url, dst):
+        """Download the URL to the destination and return its SHA-256.
+
+        The content is streamed to a partial file in the cache folder which
+        is moved to the destination once it is complete.  Interrupted
+        downloads are resumed with HTTP range requests if the server
+        identifies the content by an ``ETag`` or ``Last-Modified`` header.
+        """
+        import requests
+
+        dst = Path(dst)
+        # Each destination has its own partial file.
+        key = hashlib.sha1(
+            '{0}\n{1}'.format(url, dst.absolute()).encode('utf-8')
+        ).hexdigest()
+        partial = self.cache_path / self.DOWNLOADS / (key + '.part')
+        validator_path = partial.with_suffix('.json')
+        partial.parent.mkdir(parents=True, exist_ok=True)
+
+        for attempt in range(DOWNLOAD_RETRIES + 1):
+            try:
+                with validator_path.open('r') as fp:
+                    validator = json.load(fp)['validator']
+                offset = partial.stat().st_size
+            except (IOError, KeyError, ValueError):
+                validator, offset = None, 0
+
+            headers = {'Accept-Encoding': 'identity'}
+            if validator and offset:
+                headers['Range'] = 'bytes={0}-'.format(offset)
+                headers['If-Range'] = validator
+
+            checksum = hashlib.sha256()
+            try:
+                response = self.http_session.get(
+                    url,
+                    headers=headers,
+                    stream=True,
+                    timeout=DOWNLOAD_TIMEOUT,
+                )
+                try:
+                    if response.status_code == 416 and offset:
+                        # The range is not valid for the current content.
+                        partial.unlink()
+                        continue
+
+                    errors.UnexpectedStatusCode.return_or_raise(
+                        response, (200, 206)
+                    )
+                    if response.status_code == 206:
+                        with partial.open('rb') as fp:
+                            for chunk in iter(
+                                lambda: fp.read(DOWNLOAD_CHUNK_SIZE), b''
+                            ):
+                                checksum.update(chunk)
+                    else:
+                        offset = 0
+
+                    validator = response.headers.get(
+                        'ETag'
+                    ) or response.headers.get('Last-Modified')
+                    with validator_path.open('w') as fp:
+                        json.dump({'url': url, 'validator': validator}, fp)
+
+                    with partial.open('ab' if offset else 'wb') as fp:
+                        for chunk in response.iter_content(
+                            chunk_size=DOWNLOAD_CHUNK_SIZE
+                        ):
+                            fp.write(chunk)
+                            checksum.update(chunk)
+                finally:
+                    response.close()
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout,
+            ):
+                if attempt == DOWNLOAD_RETRIES:
+                    raise
+                continue
+
+            expected_size = _expected_size(response, offset)
+            if expected_size is None or \
+                    expected_size == partial.stat().st_size:
+                break
+        else:
+            raise errors.DownloadError(
+                'Download of {0} is incomplete.'.format(url)
+            )
+
+        expected_digest = _expected_digest(response)
+        if expected_digest and expected_digest != checksum.hexdigest():
+            partial.unlink()
+            validator_path.unlink()
+            raise errors.DownloadError(
+                'Checksum of {0} does not match.'.format(url)
+            )
+
+        os.replace(str(partial), str(dst))
+        validator_path.unlink()
+        return checksum.hexdigest()
+
     @property
     def datasets(self):
         """Return mapping from path to dataset."""
         result = {}
         for path in self.renku_datasets_path.rglob(self.METADATA):
-            with path.open('r') as fp:
-                result[path] = Dataset.from_jsonld(yaml.load(fp))
+            result[path] = self.load_dataset(path)
         return result
 
+    @property
+    def dataset_summaries(self):
+        """Return mapping from path to dataset summary.
+
+        Summaries are stored in an index in the cache folder and lists of
+        files are loaded only for datasets modified since the index was
+        written.
+        """
+        if not self.renku_datasets_path.exists():
+            return {}
+
+        version = cache_version(DATASETS_INDEX_VERSION)
+        index_path = self.cache_path / self.DATASETS_INDEX
+        try:
+            with index_path.open('r') as fp:
+                stored = json.load(fp)
+        except (IOError, ValueError):
+            stored = {}
+        if stored.get('version') != version:
+            stored = {'datasets': {}}
+
+        index = {}
+        result = {}
+        for path in self.renku_datasets_path.rglob(self.METADATA):
+            key = str(path.relative_to(self.renku_datasets_path))
+            signature = _signature(path)
+            entry = stored['datasets'].get(key)
+
+            if entry is None or entry['signature'] != signature:
+                dataset = self.load_dataset(path)
+                self._dump_dataset_files(key, signature, dataset)
+                summary = DatasetSummary.from_dataset(dataset)
+                entry = {
+                    'signature': signature,
+                    'summary': {
+                        'identifier': summary.identifier.hex,
+                        'name': summary.name,
+                        'created': summary.created.isoformat(),
+                        'authors': [
+                            attr.asdict(author) for author in summary.authors
+                        ],
+                        'files': summary.files,
+                    },
+                }
+            else:
+                summary = DatasetSummary(**entry['summary'])
+
+            index[key] = entry
+            result[path] = summary
+
+        if index != stored['datasets']:
+            try:
+                write_atomic(
+                    index_path,
+                    json.dumps({
+                        'version': version,
+                        'datasets': index
+                    }),
+                )
+            except (IOError, TypeError, ValueError):
+                pass
+
+        return result
+
+    @property
+    def dataset_files(self):
+        """Return mapping from path to paths of files in the dataset.
+
+        File paths are relative to the metadata file.  Each list is stored
+        in the cache folder separately from the summaries and the metadata
+        is loaded only for datasets modified since the list was written.
+        """
+        if not self.renku_datasets_path.exists():
+            return {}
+
+        version = cache_version(DATASETS_INDEX_VERSION)
+        result = {}
+        for path in self.renku_datasets_path.rglob(self.METADATA):
+            key = str(path.relative_to(self.renku_datasets_path))
+            signature = _signature(path)
+            try:
+                with self._dataset_files_path(key).open('r') as fp:
+                    stored = json.load(fp)
+            except (IOError, ValueError):
+                stored = {}
+
+            if stored.get('version') == version and \
+                    stored.get('signature') == signature:
+                result[path] = stored['files']
+            else:
+                result[path] = self._dump_dataset_files(
+                    key, signature, self.load_dataset(path)
+                )
+        return result
+
+    def _dataset_files_path(self, key):
+        """Return a path to the stored list of files of the dataset."""
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json'
+        return self.cache_path / self.DATASET_FILES / name
+
+    def _dump_dataset_files(self, key, signature, dataset):
+        """Store and return paths of files in the dataset."""
+        files = sorted(str(path) for path in dataset.files)
+        try:
+            write_atomic(
+                self._dataset_files_path(key),
+                json.dumps({
+                    'version': cache_version(DATASETS_INDEX_VERSION),
+                    'signature': signature,
+                    'files': files,
+                }),
+            )
+        except (IOError, ValueError):
+            pass
+        return files
+
+    def load_dataset(self, path):
+        """Load the dataset with its files from the metadata file."""
+        with Path(path).open('r') as fp:
+            return Dataset.from_jsonld(yaml.load(fp))
+
     @contextmanager
     def with_dataset(self, name=None):
         """Yield an editable metadata object for a dataset."""
@@ -114,29 +443,70 @@ class DatasetsApiMixin(object):
                 yaml.dump(source, f, default_flow_style=False)
 
     def add_data_to_dataset(
-        self, dataset, url, git=False, force=False, **kwargs
+        self,
+        dataset,
+        *urls,
+        git=False,
+        force=False,
+        jobs=1,
+        progress=None,
+        **kwargs
     ):
-        """Import the data into the data directory."""
-        dataset_path = self.path / self.datadir / dataset.name
-        git = git or check_for_git_repo(url)
+        """Import the data into the data directory.
 
+        Files are copied or downloaded by ``jobs`` threads.  The optional
+        ``progress`` callable receives an iterator over sizes of transferred
+        files and their number and returns an iterable context manager such
+        as :func:`click.progressbar`.
+        """
+        dataset_path = self.path / self.datadir / dataset.name
         target = kwargs.pop('target', None)
 
-        if git:
-            if isinstance(target, (str, NoneType)):
-                files = self._add_from_git(
-                    dataset, dataset_path, url, target, **kwargs
-                )
-            else:
-                files = {}
-                for t in target:
+        files = {}
+        transfers = {}
+        for url in urls:
+            if git or check_for_git_repo(url):
+                if isinstance(target, (str, NoneType)):
                     files.update(
                         self._add_from_git(
-                            dataset, dataset_path, url, t, **kwargs
+                            dataset, dataset_path, url, target, **kwargs
                         )
                     )
+                else:
+                    for t in target:
+                        files.update(
+                            self._add_from_git(
+                                dataset, dataset_path, url, t, **kwargs
+                            )
+                        )
+            else:
+                added = self._add_from_url(
+                    dataset,
+                    dataset_path,
+                    url,
+                    transfers=transfers,
+                    **kwargs
+                )
+                files.update(added)
+
+        if any(parse.urlparse(url).scheme not in ('', 'file') for url in urls):
+            # Create the shared session before it is used by the threads.
+            self.http_session
+
+        sizes = _transfer(list(transfers.values()), jobs=jobs)
+        if progress is not None:
+            with progress(sizes, len(transfers)) as bar:
+                for _ in bar:
+                    pass
         else:
-            files = self._add_from_url(dataset, dataset_path, url, **kwargs)
+            for _ in sizes:
+                pass
+
+        # Track all copied and downloaded files with a single command.
+        if transfers:
+            self.track_paths_in_storage(
+                *sorted(str(dst.relative_to(self.path)) for dst in transfers)
+            )
 
         ignored = self.find_ignored_paths(
             *[
@@ -157,8 +527,15 @@ class DatasetsApiMixin(object):
 
         dataset.files.update(files)
 
-    def _add_from_url(self, dataset, path, url, nocopy=False, **kwargs):
-        """Process an add from url and return the location on disk."""
+    def _add_from_url(
+        self, dataset, path, url, nocopy=False, transfers=None, **kwargs
+    ):
+        """Process an add from url and return the location on disk.
+
+        Copying or downloading of files is stored in ``transfers`` by
+        destination if given and the caller tracks them in the external
+        storage, otherwise files are transferred and tracked immediately.
+        """
         u = parse.urlparse(url)
 
         if u.scheme not in Dataset.SUPPORTED_SCHEMES:
@@ -190,7 +567,8 @@ class DatasetsApiMixin(object):
                             dataset,
                             dst,
                             f.absolute().as_posix(),
-                            nocopy=nocopy
+                            nocopy=nocopy,
+                            transfers=transfers,
                         )
                     )
                 return files
@@ -198,31 +576,24 @@ class DatasetsApiMixin(object):
             # Make sure the parent directory exists.
             dst.parent.mkdir(parents=True, exist_ok=True)
 
-            if nocopy:
-                try:
-                    os.link(str(src), str(dst))
-                except Exception as e:
-                    raise Exception(
-                        'Could not create hard link '
-                        '- retry without nocopy.'
-                    ) from e
+        def transfer():
+            """Copy or download the file and return its size."""
+            if u.scheme in ('', 'file'):
+                _copy(src, dst, nocopy=nocopy)
             else:
-                shutil.copy(str(src), str(dst))
+                self.download(url, dst)
 
-            # Do not expose local paths.
-            src = None
-        else:
-            try:
-                response = requests.get(url)
-                dst.write_bytes(response.content)
-            except error.HTTPError as e:  # pragma nocover
-                raise e
+            # make the added file read-only
+            mode = dst.stat().st_mode & 0o777
+            dst.chmod(mode & ~(stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH))
+            return dst.stat().st_size
 
-        # make the added file read-only
-        mode = dst.stat().st_mode & 0o777
-        dst.chmod(mode & ~(stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH))
+        if transfers is None:
+            transfer()
+            self.track_paths_in_storage(str(dst.relative_to(self.path)))
+        else:
+            transfers[dst] = transfer
 
-        self.track_paths_in_storage(str(dst.relative_to(self.path)))
         dataset_path = self.renku_datasets_path / dataset.name
         result = os.path.relpath(str(dst), start=str(dataset_path))
         return {
@@ -318,6 +689,70 @@ class DatasetsApiMixin(object):
             ])
 
         src = submodule_path / (target or '')
+        git_repo = Repo(str(submodule_path.absolute()))
+
+        # if we have a directory, link all files from the submodule index
+        is_dir = src.is_dir()
+        if is_dir:
+            self._git_destination(
+                path, url, u, submodule_path, target, relative_to
+            ).mkdir(parents=True, exist_ok=True)
+            targets = [
+                Path(name) for name in git_repo.git.
+                ls_files('-z', '--', str(target or '.')).split('\0') if name
+            ]
+        else:
+            targets = [Path(target)]
+
+        # grab all the authors from the commit history at once
+        authors, seen = defaultdict(list), set()
+        for name, author_name, author_email in iter_path_authors(
+            git_repo, str(target or '.')
+        ):
+            if (name, author_name, author_email) not in seen:
+                seen.add((name, author_name, author_email))
+                authors[name].append(
+                    Author(name=author_name, email=author_email)
+                )
+
+        files = {}
+        for file_target in targets:
+            try:
+                dst = self._git_destination(
+                    path, url, u, submodule_path, file_target, relative_to
+                )
+            except ValueError:
+                if not is_dir:
+                    raise
+                continue  # skip files outside the relative path
+
+            if not dst.parent.exists():
+                dst.parent.mkdir(parents=True)
+
+            os.symlink(
+                os.path.relpath(
+                    str(submodule_path / file_target), str(dst.parent)
+                ), str(dst)
+            )
+
+            dataset_path = self.renku_datasets_path / dataset.name
+            result = os.path.relpath(str(dst), start=str(dataset_path))
+
+            files[result] = DatasetFile(
+                path=result,
+                url=None if u.scheme in ('', 'file') else
+                '{}/{}'.format(url, file_target),
+                authors=authors[file_target.as_posix()],
+                dataset=dataset.name,  # TODO detect original dataset
+            )
+
+        return files
+
+    def _git_destination(
+        self, path, url, u, submodule_path, target, relative_to
+    ):
+        """Return the location of the submodule target in the dataset."""
+        src = submodule_path / (target or '')
 
         if target and relative_to:
             relative_to = Path(relative_to)
@@ -332,59 +767,7 @@ class DatasetsApiMixin(object):
                 # src already includes target so we do not have to append it
                 target = src.relative_to(submodule_path / relative_to)
 
-        # link the target into the data directory
-        dst = self.path / path / (target or '')
-
-        # if we have a directory, recurse
-        if src.is_dir():
-            files = {}
-            dst.mkdir(parents=True, exist_ok=True)
-            # FIXME get all files from submodule index
-            for f in src.iterdir():
-                try:
-                    files.update(
-                        self._add_from_git(
-                            dataset,
-                            path,
-                            url,
-                            target=f.relative_to(submodule_path),
-                            **kwargs
-                        )
-                    )
-                except ValueError:
-                    pass  # skip files outside the relative path
-            return files
-
-        if not dst.parent.exists():
-            dst.parent.mkdir(parents=True)
-
-        os.symlink(os.path.relpath(str(src), str(dst.parent)), str(dst))
-
-        # grab all the authors from the commit history
-        git_repo = Repo(str(submodule_path.absolute()))
-        authors = []
-        for commit in git_repo.iter_commits(paths=target):
-            author = Author.from_commit(commit)
-            if author not in authors:
-                authors.append(author)
-
-        dataset_path = self.renku_datasets_path / dataset.name
-        result = os.path.relpath(str(dst), start=str(dataset_path))
-
-        if u.scheme in ('', 'file'):
-            url = None
-        else:
-            url = '{}/{}'.format(url, target)
-
-        return {
-            result:
-                DatasetFile(
-                    path=result,
-                    url=url,
-                    authors=authors,
-                    dataset=dataset.name,  # TODO detect original dataset
-                )
-        }
+        return self.path / path / (target or '')
 
     def get_relative_url(self, url):
         """Determine if the repo url should be relative."""
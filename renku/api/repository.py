@@ -18,20 +18,21 @@
 """Client for handling a local repository."""
 
 import datetime
+import hashlib
+import json
+import re
 import uuid
 from collections import defaultdict
 from contextlib import contextmanager
 from subprocess import check_output
 
 import attr
-import filelock
 import yaml
-from werkzeug.utils import cached_property, secure_filename
 
-from renku._compat import Path
+from renku._compat import Path, cached_property
 from renku.models.refs import LinkReference
 
-from ._git import GitCore
+from ._git import GitCore, GitReader, PathHistory, Repo
 
 
 def default_path():
@@ -82,6 +83,12 @@ class RepositoryApiMixin(GitCore):
     WORKFLOW = 'workflow'
     """Directory for storing workflow in Renku."""
 
+    CACHE = 'cache'
+    """Directory for storing data derived from the repository history."""
+
+    SUBMODULES = 'submodules.json'
+    """File in the cache folder with the state of initialized submodules."""
+
     def __attrs_post_init__(self):
         """Initialize computed attributes."""
         #: Configure Renku path.
@@ -93,20 +100,21 @@ class RepositoryApiMixin(GitCore):
         self.renku_path = path
 
         self._subclients = {}
+        self._subclient_pool = {}
+        self._resolved = {}
+        self._path_histories = {}
 
         super().__attrs_post_init__()
 
-        # initialize submodules
-        if self.repo:
-            check_output([
-                'git', 'submodule', 'update', '--init', '--recursive'
-            ],
-                         cwd=str(self.path))
-        # TODO except
+        # Nested submodules are initialized recursively by the parent client.
+        if self.repo and self.parent is None:
+            self.init_submodules()
 
     @property
     def lock(self):
         """Create a Renku config lock."""
+        import filelock
+
         return filelock.FileLock(
             str(self.renku_path.with_suffix(self.LOCK_SUFFIX))
         )
@@ -121,6 +129,82 @@ class RepositoryApiMixin(GitCore):
         """Return a ``Path`` instance of the workflow folder."""
         return self.renku_path / self.WORKFLOW
 
+    @cached_property
+    def cache_path(self):
+        """Return a ``Path`` instance of the (Git ignored) cache folder."""
+        path = self.renku_path / self.CACHE
+        path.mkdir(parents=True, exist_ok=True)
+
+        gitignore = path / '.gitignore'
+        if not gitignore.exists():
+            gitignore.write_text('*\n')
+
+        return path
+
+    def _submodules_state(self):
+        """Return the state of submodules or ``None`` without submodules."""
+        gitmodules = self.path / '.gitmodules'
+        if not gitmodules.exists():
+            return None
+
+        content = gitmodules.read_bytes()
+        paths = re.findall(
+            r'^\s*path\s*=\s*(.+?)\s*$',
+            content.decode('utf-8', 'replace'),
+            flags=re.MULTILINE,
+        )
+        from git import GitCommandError
+
+        # Gitlinks change only when submodules are moved to new commits.
+        gitlinks = ''
+        if paths:
+            try:
+                gitlinks = self.repo.git.ls_tree('HEAD', '--', *paths)
+            except GitCommandError:
+                gitlinks = None
+
+        return {
+            'gitmodules': hashlib.sha1(content).hexdigest(),
+            'gitlinks': gitlinks,
+            'initialized': all((self.path / path / '.git').exists()
+                               for path in paths),
+        }
+
+    def init_submodules(self):
+        """Initialize submodules if they changed since the last update.
+
+        The state of ``.gitmodules`` and of submodule commits recorded in
+        ``HEAD`` is stored in the cache folder after every update, hence the
+        Git call is skipped while all submodules are initialized and the
+        state has not changed.
+        """
+        state = self._submodules_state()
+        if state is None:
+            return
+
+        stored_path = self.renku_path / self.CACHE / self.SUBMODULES
+        if state['initialized']:
+            try:
+                with stored_path.open('r') as fp:
+                    if json.load(fp) == state:
+                        return
+            except (IOError, ValueError):
+                pass
+
+        check_output(['git', 'submodule', 'update', '--init', '--recursive'],
+                     cwd=str(self.path))
+
+        if not self.renku_path.exists():
+            return
+
+        state = self._submodules_state()
+        if state is not None:
+            try:
+                with (self.cache_path / self.SUBMODULES).open('w') as fp:
+                    json.dump(state, fp)
+            except IOError:
+                pass
+
     @cached_property
     def cwl_prefix(self):
         """Return a CWL prefix."""
@@ -168,18 +252,65 @@ class RepositoryApiMixin(GitCore):
         """Check if the path is a valid CWL file."""
         return path.startswith(self.cwl_prefix) and path.endswith('.cwl')
 
+    @cached_property
+    def git_reader(self):
+        """Return a reader of commits and files."""
+        return GitReader(self.repo)
+
+    def path_history(self, revision='HEAD'):
+        """Return an index of commits modifying paths in the revision."""
+        commit = self.repo.rev_parse(str(revision)).hexsha
+
+        for history in self._path_histories.values():
+            if commit in history:
+                return history, commit
+
+        history = PathHistory(self.git_reader, commit)
+        self._path_histories[commit] = history
+        return history, commit
+
     def find_previous_commit(self, paths, revision='HEAD'):
-        """Return a previous commit for a given path."""
-        file_commits = list(self.repo.iter_commits(revision, paths=paths))
+        """Return a previous commit for a given path.
+
+        Absolute paths must point inside of the repository.
+        """
+        path = Path(paths)
+        if path.is_absolute():
+            try:
+                paths = str(path.relative_to(self.path))
+            except ValueError:
+                try:
+                    paths = str(
+                        path.parent.resolve().relative_to(self.path) /
+                        path.name
+                    )
+                except ValueError:
+                    raise ValueError(
+                        'Path {0} is not in the repository {1}.'.format(
+                            path, self.path
+                        )
+                    )
+
+        if '..' in str(revision):
+            file_commits = self.repo.iter_commits(revision, paths=paths)
+            file_commit = next(file_commits, None)
+        else:
+            history, commit = self.path_history(revision)
+            try:
+                file_commit = self.repo.commit(
+                    history.find_previous_commit(paths, revision=commit)
+                )
+            except KeyError:
+                file_commit = None
 
-        if not file_commits:
+        if file_commit is None:
             raise KeyError(
                 'Could not find a file {0} in range {1}'.format(
                     paths, revision
                 )
             )
 
-        return file_commits[0]
+        return file_commit
 
     @cached_property
     def workflow_names(self):
@@ -198,7 +329,11 @@ class RepositoryApiMixin(GitCore):
         return []
 
     def subclients(self, parent_commit):
-        """Return mapping from submodule to client."""
+        """Return mapping from submodule to client.
+
+        One client is created per submodule and shared by all commits, so
+        its index of the submodule history is read only once.
+        """
         if parent_commit in self._subclients:
             return self._subclients[parent_commit]
 
@@ -213,34 +348,47 @@ class RepositoryApiMixin(GitCore):
             # There are no submodules assiciated with the given commit.
             submodules = []
 
-        return self._subclients.setdefault(
-            parent_commit, {
-                submodule: self.__class__(
+        subclients = {}
+        for submodule in submodules:
+            key = (submodule.name, submodule.path)
+            if key not in self._subclient_pool:
+                self._subclient_pool[key] = self.__class__(
                     path=(self.path / submodule.path).resolve(),
                     parent=(self, submodule),
                 )
-                for submodule in submodules
-            }
-        )
+            subclients[submodule] = self._subclient_pool[key]
+
+        return self._subclients.setdefault(parent_commit, subclients)
 
     def resolve_in_submodules(self, commit, path):
         """Resolve filename in submodules."""
         original_path = self.path / path
         if original_path.is_symlink() or str(path
                                              ).startswith('.renku/vendors'):
-            original_path = original_path.resolve()
-            for submodule, subclient in self.subclients(commit).items():
-                try:
-                    subpath = original_path.relative_to(subclient.path)
-                    return (
-                        subclient,
-                        subclient.find_previous_commit(
-                            subpath, revision=submodule.hexsha
-                        ),
-                        subpath,
-                    )
-                except ValueError:
-                    pass
+            # Symlinks are resolved once per commit and path.
+            key = (getattr(commit, 'hexsha', commit), str(path))
+            if key not in self._resolved:
+                self._resolved[key] = self._resolve_in_submodules(
+                    commit, original_path.resolve(), path
+                )
+            return self._resolved[key]
+
+        return self, commit, path
+
+    def _resolve_in_submodules(self, commit, original_path, path):
+        """Find the submodule containing the resolved path."""
+        for submodule, subclient in self.subclients(commit).items():
+            try:
+                subpath = original_path.relative_to(subclient.path)
+                return (
+                    subclient,
+                    subclient.find_previous_commit(
+                        subpath, revision=submodule.hexsha
+                    ),
+                    subpath,
+                )
+            except ValueError:
+                pass
 
         return self, commit, path
 
@@ -271,6 +419,8 @@ class RepositoryApiMixin(GitCore):
     def with_workflow_storage(self):
         """Yield a workflow storage."""
         with self.lock:
+            from werkzeug.utils import secure_filename
+
             from renku.models.cwl._ascwl import ascwl
             from renku.models.cwl.workflow import Workflow
 
@@ -302,8 +452,6 @@ class RepositoryApiMixin(GitCore):
 
     def init_repository(self, name=None, force=False):
         """Initialize a local Renku repository."""
-        from git import Repo
-
         path = self.path.absolute()
         if force:
             self.renku_path.mkdir(parents=True, exist_ok=force)
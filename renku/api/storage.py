@@ -31,6 +31,22 @@ from .repository import RepositoryApiMixin
 
 HAS_LFS = call(['git', 'lfs'], stdout=PIPE, stderr=STDOUT) == 0
 
+MAX_ARGUMENTS_LENGTH = 100000
+"""Maximal length of arguments passed to a single command."""
+
+
+def _batches(args, limit=MAX_ARGUMENTS_LENGTH):
+    """Split arguments to batches not exceeding the given length."""
+    batch, length = [], 0
+    for arg in sorted(args):
+        if batch and length + len(arg) + 1 > limit:
+            yield batch
+            batch, length = [], 0
+        batch.append(arg)
+        length += len(arg) + 1
+    if batch:
+        yield batch
+
 
 @attr.s
 class StorageApiMixin(RepositoryApiMixin):
@@ -65,29 +81,34 @@ class StorageApiMixin(RepositoryApiMixin):
         ).has_section('filter "lfs"')
 
     def track_paths_in_storage(self, *paths):
-        """Track paths in the external storage."""
+        """Track paths in the external storage.
+
+        Paths are tracked by as few commands as possible, which update
+        ``.gitattributes`` once per command.
+        """
         if self.use_external_storage and self.external_storage_installed:
             track_paths = []
             attrs = self.find_attr(*paths)
 
             for path in paths:
                 # Do not add files with filter=lfs in .gitattributes
-                if attrs.get(path, {}).get('filter') == 'lfs':
+                if attrs.get(str(path), {}).get('filter') == 'lfs':
                     continue
 
                 path = Path(path)
-                if path.is_dir():
+                if (self.path / path).is_dir():
                     track_paths.append(str(path / '**'))
                 elif path.suffix != '.ipynb':
                     # TODO create configurable filter and follow .gitattributes
                     track_paths.append(str(path))
 
-            call(
-                self._CMD_STORAGE_TRACK + track_paths,
-                stdout=PIPE,
-                stderr=STDOUT,
-                cwd=str(self.path),
-            )
+            for batch in _batches(track_paths):
+                call(
+                    self._CMD_STORAGE_TRACK + batch,
+                    stdout=PIPE,
+                    stderr=STDOUT,
+                    cwd=str(self.path),
+                )
         elif self.use_external_storage:
             raise errors.ExternalStorageNotInstalled(self.repo)
 
@@ -42,6 +42,7 @@ execute ``renku help``:
                                       [default: .renku]
       --external-storage / -S, --no-external-storage
                                       Use an external file storage service.
+      --show-git-calls                Print number of executed Git calls.
       -h, --help                      Show this message and exit.
 
     Commands:
@@ -73,6 +74,24 @@ the ``--config`` option value is used. For example:
 
 instructs Renku to store the configuration files in your ``~/renku/config/``
 directory when running the ``init`` command.
+
+Concurrency
+~~~~~~~~~~~
+
+Commands building the provenance graph (e.g. ``status``, ``log`` or
+``update``) read information from several commits concurrently. By default
+one worker per CPU is used. You can change the number of workers via the
+``RENKU_JOBS`` environment variable:
+
+.. code-block:: console
+
+    $ RENKU_JOBS=1 renku log
+
+The same variable sets the default number of files copied or downloaded
+concurrently by ``renku dataset add``.
+
+Commands reading the provenance graph can be answered by a long-lived process
+keeping the repository in memory. See ``renku daemon`` for details.
 """
 
 import uuid
@@ -85,27 +104,9 @@ from ..api.client import LocalClient
 from ..api.repository import default_path
 from ._config import RENKU_HOME, default_config_dir, print_app_config_path
 from ._exc import IssueFromTraceback
+from ._git import show_git_calls
 from ._options import install_completion, option_use_external_storage
 from ._version import check_version, print_version
-from .config import config
-from .dataset import dataset
-from .doctor import doctor
-from .githooks import githooks
-from .image import image
-from .init import init
-from .log import log
-from .migrate import migrate
-from .move import move
-from .pull import pull
-from .rerun import rerun
-from .run import run
-from .runner import runner
-from .show import show
-from .status import status
-from .storage import storage
-from .update import update
-from .workflow import workflow
-from .workon import deactivate, workon
 
 #: Monkeypatch Click application.
 click_completion.init()
@@ -183,9 +184,24 @@ yaml.add_representer(uuid.UUID, _uuid_representer)
     expose_value=False,
     help='Do not periodically check PyPI for a new version of renku.',
 )
+@click.option(
+    '--show-git-calls',
+    envvar='RENKU_SHOW_GIT_CALLS',
+    is_flag=True,
+    default=False,
+    callback=show_git_calls,
+    expose_value=False,
+    help='Print number of executed Git calls.',
+)
 @click.pass_context
 def cli(ctx, path, renku_home, use_external_storage):
     """Check common Renku commands used in various situations."""
+    if ctx.obj is not None:
+        return
+
+    from ._daemon import forward
+    forward(ctx, path, renku_home, use_external_storage)
+
     ctx.obj = LocalClient(
         path=path,
         renku_home=renku_home,
@@ -200,24 +216,25 @@ def help(ctx):
     click.echo(ctx.parent.get_help())
 
 
-# Register subcommands:
-cli.add_command(config)
-cli.add_command(dataset)
-cli.add_command(deactivate)
-cli.add_command(doctor)
-cli.add_command(githooks)
-cli.add_command(image)
-cli.add_command(init)
-cli.add_command(log)
-cli.add_command(migrate)
-cli.add_command(move)
-cli.add_command(pull)
-cli.add_command(rerun)
-cli.add_command(run)
-cli.add_command(runner)
-cli.add_command(show)
-cli.add_command(status)
-cli.add_command(storage)
-cli.add_command(update)
-cli.add_command(workflow)
-cli.add_command(workon)
+# Register subcommands, which are imported only when they are invoked:
+cli.add_lazy_command('.config:config', 'config')
+cli.add_lazy_command('.daemon:daemon', 'daemon')
+cli.add_lazy_command('.dataset:dataset', 'dataset')
+cli.add_lazy_command('.workon:deactivate', 'deactivate')
+cli.add_lazy_command('.doctor:doctor', 'doctor')
+cli.add_lazy_command('.githooks:githooks', 'githooks')
+cli.add_lazy_command('.image:image', 'image')
+cli.add_lazy_command('.init:init', 'init')
+cli.add_lazy_command('.log:log', 'log')
+cli.add_lazy_command('.migrate:migrate', 'migrate')
+cli.add_lazy_command('.move:move', 'mv')
+cli.add_lazy_command('.pull:pull', 'pull')
+cli.add_lazy_command('.rerun:rerun', 'rerun')
+cli.add_lazy_command('.run:run', 'run')
+cli.add_lazy_command('.runner:runner', 'runner')
+cli.add_lazy_command('.show:show', 'show')
+cli.add_lazy_command('.status:status', 'status')
+cli.add_lazy_command('.storage:storage', 'storage')
+cli.add_lazy_command('.update:update', 'update')
+cli.add_lazy_command('.workflow:workflow', 'workflow')
+cli.add_lazy_command('.workon:workon', 'workon')
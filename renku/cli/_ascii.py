@@ -18,6 +18,7 @@
 """Generate ASCII graph for a DAG."""
 
 import re
+from itertools import islice
 
 import attr
 import click
@@ -78,18 +79,53 @@ class DAG(object):
     last_columns_size_diff = attr.ib(default=0, converter=int)
     last_index = attr.ib(default=0, converter=int)
 
+    refs = attr.ib(default=attr.Factory(dict))
+    """Map of workflow reference names for paths of each client."""
+
+    batch_size = attr.ib(default=64, converter=int)
+    """Number of nodes annotated before the first lines are rendered."""
+
     def __str__(self):
         """Return string representation."""
         return '\n'.join(self)
 
     def __iter__(self):
-        """Generate lines of ASCII representation of a DAG."""
-        for node in self.graph.nodes:
-            for node_symbol, lines, column_info in self.iter_edges(node):
-                for line in self.iter_node_lines(
-                    node_symbol, self.node_text(node), column_info
-                ):
-                    yield line
+        """Generate lines of ASCII representation of a DAG.
+
+        Nodes are annotated in batches of growing size, hence the first
+        lines are rendered without annotating the whole graph.
+        """
+        nodes = iter(self.graph.nodes)
+        size = self.batch_size
+
+        while True:
+            batch = list(islice(nodes, size))
+            if not batch:
+                break
+
+            self.annotate(batch)
+            size *= 2
+
+            for node in batch:
+                for node_symbol, lines, column_info in self.iter_edges(node):
+                    for line in self.iter_node_lines(
+                        node_symbol, self.node_text(node), column_info
+                    ):
+                        yield line
+
+    def annotate(self, nodes):
+        """Find latest commits and reference names of all nodes at once."""
+        self.graph.prefetch_latest(nodes)
+
+        for node in nodes:
+            self._workflow_names(node.client)
+
+    def _workflow_names(self, client):
+        """Return workflow reference names of paths in the client."""
+        key = id(client)
+        if key not in self.refs:
+            self.refs[key] = client.workflow_names
+        return self.refs[key]
 
     def node_text(self, node):
         """Return text for a given node."""
@@ -99,7 +135,7 @@ class DAG(object):
 
         # TODO move reference names to entity objects
         from .workflow import _deref
-        refs = node.client.workflow_names[node.path]
+        refs = self._workflow_names(node.client).get(node.path, [])
         formatted_refs = (
             click.style(' (', fg='yellow') + ', '.join(
                 click.style(_deref(name), fg='green', bold=True)
@@ -0,0 +1,627 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Persistent cache of provenance extracted from Git commits."""
+
+import json
+import os
+import shutil
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import attr
+import yaml
+
+from renku._compat import Path
+from renku.api._cache import cache_version, write_atomic
+from renku.api._git import GitReader, Repo
+from renku.models.cwl._ascwl import CWLClass
+from renku.models.provenance import Activity, ProcessRun, Usage
+from renku.models.provenance.activities import find_process_path
+from renku.models.provenance.entities import Entity
+
+_ACTIVITIES = {}
+"""Activities kept in memory for clients of long-lived processes."""
+
+
+def keep_activities(client):
+    """Keep activities of the client in memory until it is released."""
+    _ACTIVITIES.setdefault(id(client), (client, {}))
+
+
+def release_activities(client):
+    """Forget activities kept in memory for the client."""
+    _ACTIVITIES.pop(id(client), None)
+
+
+def _read_process_path(commit, client):
+    """Return a path of the process definition added in the commit."""
+    if len(commit.parents) < 2:
+        return find_process_path(commit, client)
+
+
+def _read_record(commit, client):
+    """Read the process definition added in the commit."""
+    record = {'path': _read_process_path(commit, client), 'process': None}
+
+    if record['path']:
+        record['process'] = yaml.load(
+            client.git_reader.read(commit, record['path'])
+        )
+
+    return record
+
+
+@attr.s
+class ActivityCache:
+    """Store information about activities keyed by the commit SHA.
+
+    Commits are immutable hence the process definition, the list of
+    modified paths and the versions of used inputs can be stored once and
+    reused by every following command.
+    """
+
+    SCHEMA_VERSION = 1
+    """Version of stored records (change it when the models change)."""
+
+    NAME = 'activities'
+    """Name of the cache folder."""
+
+    client = attr.ib()
+
+    _pruned = attr.ib(default=False, init=False)
+    _prefetched = attr.ib(default=attr.Factory(dict), init=False)
+
+    _executor = attr.ib(default=None, init=False)
+    _local = attr.ib(default=attr.Factory(threading.local), init=False)
+    _readers = attr.ib(default=attr.Factory(list), init=False)
+
+    @property
+    def version(self):
+        """Return a key identifying renku and record versions."""
+        return cache_version(self.SCHEMA_VERSION)
+
+    @property
+    def _memory(self):
+        """Return activities kept in memory for the client or ``None``."""
+        client, activities = _ACTIVITIES.get(id(self.client), (None, None))
+        if client is self.client:
+            return activities
+
+    @property
+    def path(self):
+        """Return a path to the folder with records for current version."""
+        return self.client.cache_path / self.NAME / self.version
+
+    def _record_path(self, commit):
+        """Return a path to the record of the given commit."""
+        return self.path / commit.hexsha[:2] / (commit.hexsha[2:] + '.json')
+
+    def _prune(self):
+        """Remove records created by other versions."""
+        if self._pruned:
+            return
+
+        self._pruned = True
+        root = self.path.parent
+        if not root.exists():
+            return
+
+        for path in root.iterdir():
+            if path.name != self.version:
+                shutil.rmtree(str(path), ignore_errors=True)
+
+    def load(self, commit):
+        """Return a stored record or ``None``."""
+        try:
+            with self._record_path(commit).open('r') as fp:
+                return json.load(fp)
+        except (IOError, ValueError):
+            return None
+
+    def dump(self, commit, record):
+        """Store the record in the cache."""
+        self._prune()
+
+        try:
+            write_atomic(
+                self._record_path(commit), json.dumps(record, sort_keys=True)
+            )
+        except (IOError, TypeError, ValueError):
+            pass
+
+    def _activity(self, commit, record):
+        """Create an activity from the given record."""
+        client = self.client
+        kwargs = {}
+
+        if record['process'] is None:
+            if record.get('outputs') is not None:
+                kwargs['outputs'] = {path: None for path in record['outputs']}
+            return Activity(commit=commit, client=client, **kwargs)
+
+        if record.get('inputs') is not None:
+            kwargs['inputs'] = {
+                path: Usage(
+                    entity=Entity(
+                        client=client,
+                        commit=client.repo.commit(usage['commit']),
+                        path=path,
+                    ),
+                    role=usage['role'],
+                    id=usage['id'],
+                )
+                for path, usage in record['inputs'].items()
+            }
+
+        process = CWLClass.from_cwl(record['process'])
+        return process.create_run(
+            commit=commit,
+            client=client,
+            process=process,
+            path=record['path'],
+            **kwargs
+        )
+
+    def _inputs(self, activity):
+        """Return serialized inputs if they can be stored."""
+        inputs = {}
+
+        for path, usage in activity.inputs.items():
+            entity = usage.entity
+            # Directories are expanded from the working tree and submodules
+            # need their own clients, hence they are always recalculated.
+            if type(entity) is not Entity or entity.client != self.client:
+                return None
+
+            inputs[path] = {
+                'commit': entity.commit.hexsha,
+                'role': usage.role,
+                'id': usage._id,
+            }
+
+        return inputs
+
+    def prefetch(self, commits, jobs=1):
+        """Read process definitions of commits missing in the cache.
+
+        Modified paths of all commits are known after a single ``git log``
+        call, hence only the process definitions are read concurrently.
+        Each worker thread uses its own repository instance since the
+        long-lived Git processes can not be shared between threads. Workers
+        and their Git processes are kept until :meth:`close` is called.
+
+        Workers only wait for Git and the definitions are parsed in the
+        calling thread, since parsing holds the GIL.
+        """
+        missing = [
+            commit
+            for commit in commits if commit.hexsha not in self._prefetched and
+            not self._record_path(commit).exists()
+        ]
+        if jobs < 2 or len(missing) < 2:
+            return
+
+        records = {
+            commit.hexsha: {
+                'path': _read_process_path(commit, self.client),
+                'process': None,
+            }
+            for commit in missing
+        }
+        processes = [(hexsha, record['path'])
+                     for hexsha, record in records.items() if record['path']]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=jobs)
+
+        for (hexsha, _), data in zip(
+            processes, self._executor.map(self._read_process, processes)
+        ):
+            if data is not None:
+                try:
+                    records[hexsha]['process'] = yaml.load(data)
+                    continue
+                except yaml.YAMLError:
+                    pass
+
+            # The record is read again when the activity is created.
+            del records[hexsha]
+
+        self._prefetched.update(records)
+
+    def _read_process(self, process):
+        """Read the process using a reader of the current thread."""
+        reader = getattr(self._local, 'reader', None)
+        if reader is None:
+            reader = self._local.reader = GitReader(
+                Repo(str(self.client.path))
+            )
+            self._readers.append(reader)
+        try:
+            return reader.read(*process)
+        except KeyError:
+            return None
+
+    def close(self):
+        """Stop worker threads and their long-lived Git processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        for reader in self._readers:
+            reader.close()
+            reader.repo.close()
+        self._readers = []
+        self._local = threading.local()
+
+    def from_git_commit(self, commit, client):
+        """Return an activity for the commit using stored information."""
+        # Submodules are not cached since their clients are not persistent.
+        if client != self.client:
+            return Activity.from_git_commit(commit, client=client)
+
+        memory = self._memory
+        if memory is not None and commit.hexsha in memory:
+            activity = memory.pop(commit.hexsha)
+            if self._uses_files(activity):
+                memory[commit.hexsha] = activity
+                return activity
+
+        record = self.load(commit)
+        if record is not None:
+            activity = self._activity(commit, record)
+            return self._remember(commit, record, activity)
+
+        record = self._prefetched.pop(commit.hexsha, None)
+        if record is None:
+            record = _read_record(commit, client)
+
+        try:
+            # Keep a copy since the conversion can modify the original data.
+            stored = json.loads(json.dumps(record))
+        except (TypeError, ValueError):
+            stored = None
+
+        activity = self._activity(commit, record)
+
+        if stored is not None:
+            if isinstance(activity, ProcessRun):
+                stored['inputs'] = self._inputs(activity)
+            else:
+                stored['outputs'] = list(activity.outputs)
+
+            self.dump(commit, stored)
+            self._remember(commit, stored, activity)
+
+        return activity
+
+    def _uses_files(self, activity):
+        """Check that all generated paths are files in the working tree.
+
+        Generated directories are listed from the working tree when the
+        activity is created, hence such activities are never reused.
+        """
+        return all(
+            type(generation.entity) is Entity and
+            not (self.client.path / generation.entity.path).is_dir()
+            for generation in activity.generated
+        )
+
+    def _remember(self, commit, record, activity):
+        """Keep the activity in memory if it does not use the working tree.
+
+        Only activities with stored inputs or outputs and without generated
+        directories are kept. Generated paths are checked again before the
+        activity is reused.
+        """
+        memory = self._memory
+        if memory is None or type(activity) not in (Activity, ProcessRun):
+            return activity
+
+        stored = record.get('inputs') is not None or \
+            record.get('outputs') is not None
+        if stored and self._uses_files(activity):
+            memory[commit.hexsha] = activity
+        return activity
+
+
+@attr.s
+class StatusCache:
+    """Store status of generated files together with the evaluated revision.
+
+    Only files depending on paths modified since the stored revision need
+    to be evaluated again.
+    """
+
+    SCHEMA_VERSION = 2
+    """Version of stored status (change it when the format changes)."""
+
+    client = attr.ib()
+    can_be_cwl = attr.ib(default=False)
+
+    @property
+    def path(self):
+        """Return a path to the stored status."""
+        name = 'status-cwl.json' if self.can_be_cwl else 'status.json'
+        return self.client.cache_path / name
+
+    def load(self):
+        """Return a stored status or ``None``."""
+        try:
+            with self.path.open('r') as fp:
+                stored = json.load(fp)
+        except (IOError, ValueError):
+            return None
+
+        if stored.get('version') != cache_version(self.SCHEMA_VERSION):
+            return None
+        return stored
+
+    def staged(self, commit):
+        """Return changes staged in the index since the commit."""
+        return sorted([diff.change_type, diff.a_path, diff.b_path]
+                      for diff in commit.diff())
+
+    def dump(self, commit, status, edges, staged=None):
+        """Store the status computed for the given commit and index."""
+        nodes = [
+            node for nodes in status['outdated'].values() for node in nodes
+        ]
+        nodes.extend(status['deleted'].values())
+
+        # Nodes from submodules can not be restored without their clients.
+        if any(node.submodules for node in nodes):
+            return
+
+        stored = {
+            'version': cache_version(self.SCHEMA_VERSION),
+            'revision': commit.hexsha,
+            'staged': staged,
+            'up-to-date': {
+                path: commit.hexsha
+                for path, commit in status['up-to-date'].items()
+            },
+            'outdated': {
+                path: [[node.path, node.commit.hexsha] for node in nodes]
+                for path, nodes in status['outdated'].items()
+            },
+            'deleted': {
+                path: node.commit.hexsha
+                for path, node in status['deleted'].items()
+            },
+            'edges': edges,
+        }
+
+        try:
+            write_atomic(self.path, json.dumps(stored, sort_keys=True))
+        except (IOError, TypeError, ValueError):
+            pass
+
+    def changed_paths(self, stored, commit, staged=None):
+        """Return paths modified since the stored revision.
+
+        Return ``None`` if the stored status can not be reused, because the
+        revisions are not related, some paths have been removed or different
+        changes are staged in the index.
+        """
+        if stored is None or stored['staged'] != staged:
+            return None
+
+        if stored['revision'] == commit.hexsha:
+            return set()
+
+        from git import GitCommandError
+
+        repo = self.client.repo
+        try:
+            if not repo.is_ancestor(stored['revision'], commit.hexsha):
+                return None
+            diffs = repo.commit(stored['revision']).diff(commit)
+        except (GitCommandError, ValueError):
+            return None
+
+        changed = set()
+        for diff in diffs:
+            if diff.deleted_file or diff.renamed_file:
+                return None
+            changed.add(diff.b_path)
+        return changed
+
+    def invalidated(self, stored, changed):
+        """Return generated paths depending on the changed paths."""
+        seeds = set()
+        for path in changed:
+            while path not in seeds:
+                seeds.add(path)
+                path = os.path.dirname(path) or '.'
+
+        children = defaultdict(set)
+        members = defaultdict(set)
+        for outputs, inputs in stored['edges']:
+            for input_ in inputs:
+                children[input_].update(outputs)
+
+                # Files inside generated directories are used as well.
+                parent = os.path.dirname(input_)
+                while parent:
+                    members[parent].add(input_)
+                    parent = os.path.dirname(parent)
+
+        keys = set(stored['up-to-date']) | set(stored['outdated'])
+        invalidated = keys & seeds
+        queue = deque(seeds | invalidated)
+
+        while queue:
+            path = queue.popleft()
+            for input_ in {path} | members.get(path, set()):
+                for output in children.get(input_, ()):
+                    if output not in invalidated:
+                        invalidated.add(output)
+                        queue.append(output)
+
+        return invalidated
+
+    def restore(self, stored):
+        """Return status and dependency edges from the stored data."""
+        client = self.client
+        repo = client.repo
+
+        def _node(path, hexsha):
+            """Create a lightweight node."""
+            return Entity(client=client, commit=repo.commit(hexsha), path=path)
+
+        status = {
+            'up-to-date': {
+                path: repo.commit(hexsha)
+                for path, hexsha in stored['up-to-date'].items()
+            },
+            'outdated': {
+                path: [_node(*node) for node in nodes]
+                for path, nodes in stored['outdated'].items()
+            },
+            'multiple-versions': {},
+            'deleted': {
+                path: _node(path, hexsha)
+                for path, hexsha in stored['deleted'].items()
+            },
+        }
+        return status, stored['edges']
+
+
+@attr.s
+class OutputsCache:
+    """Store paths generated by runs together with the evaluated revision.
+
+    Only commits made since the stored revision are read to bring the
+    outputs up to date, hence checking modified paths before every commit
+    does not require building the provenance graph.
+    """
+
+    SCHEMA_VERSION = 2
+    """Version of stored outputs (change it when the format changes)."""
+
+    NAME = 'outputs.json'
+    """Name of the file with stored outputs."""
+
+    client = attr.ib()
+
+    @property
+    def path(self):
+        """Return a path to the stored outputs."""
+        return self.client.cache_path / self.NAME
+
+    def load(self):
+        """Return stored outputs or ``None``."""
+        try:
+            with self.path.open('r') as fp:
+                stored = json.load(fp)
+        except (IOError, ValueError):
+            return None
+
+        if stored.get('version') != cache_version(self.SCHEMA_VERSION):
+            return None
+        return stored
+
+    def dump(self, commit, outputs):
+        """Store outputs generated in the history of the given commit."""
+        stored = {
+            'version': cache_version(self.SCHEMA_VERSION),
+            'revision': commit.hexsha,
+            'outputs': outputs,
+        }
+
+        try:
+            write_atomic(self.path, json.dumps(stored, sort_keys=True))
+        except (IOError, TypeError, ValueError):
+            pass
+
+    def outputs(self, revision='HEAD', jobs=1):
+        """Return generated paths mapped to SHAs of generating commits."""
+        from git import GitCommandError
+
+        from renku.api._git import iter_commit_changes
+
+        client = self.client
+        repo = client.repo
+        commit = repo.rev_parse(revision)
+
+        revisions = [commit.hexsha]
+        outputs = {}
+
+        stored = self.load()
+        if stored is not None:
+            if stored['revision'] == commit.hexsha:
+                return stored['outputs']
+
+            try:
+                if repo.is_ancestor(stored['revision'], commit.hexsha):
+                    revisions.append('^' + stored['revision'])
+                    outputs = stored['outputs']
+            except GitCommandError:
+                pass
+
+        history = list(iter_commit_changes(repo, '--topo-order', *revisions))
+        history.reverse()
+
+        runs = set()
+        for hexsha, parents, changes in history:
+            processes = [
+                paths[-1] for _, paths in changes if client.is_cwl(paths[-1])
+            ]
+            if len(parents) < 2 and len(processes) == 1:
+                runs.add(hexsha)
+
+        cache = ActivityCache(client)
+        try:
+            cache.prefetch(
+                [repo.commit(hexsha) for hexsha in runs], jobs=jobs
+            )
+        finally:
+            cache.close()
+
+        for hexsha, _, changes in history:
+            # Deleted or moved files are not generated anymore.
+            parents = set()
+            for status, paths in changes:
+                if status[0] in 'DR':
+                    outputs.pop(paths[0], None)
+                    parents.update(map(str, Path(paths[0]).parents))
+
+            # Generated directories are removed with their last file.
+            parents &= set(outputs)
+            if parents:
+                tree = repo.commit(hexsha).tree
+                for path in parents:
+                    try:
+                        tree / path
+                    except KeyError:
+                        del outputs[path]
+
+            if hexsha in runs:
+                activity = cache.from_git_commit(
+                    repo.commit(hexsha), client=client
+                )
+                if isinstance(activity, ProcessRun):
+                    outputs.update({
+                        path: hexsha
+                        for path in activity.outputs if path
+                    })
+
+        self.dump(commit, outputs)
+        return outputs
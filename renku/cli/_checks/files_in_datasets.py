@@ -29,8 +29,8 @@ def check_missing_files(client):
     """Find missing files listed in datasets."""
     missing = defaultdict(list)
 
-    for path, dataset in client.datasets.items():
-        for file in dataset.files:
+    for path, files in client.dataset_files.items():
+        for file in files:
             filepath = (path.parent / file)
             if not filepath.exists():
                 missing[str(
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Serve read-only commands from a long-lived process."""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import traceback
+
+import attr
+import click
+
+from renku._compat import Path
+
+from ._echo import record_pager
+from ._group import SUBCOMMAND_ARGS
+
+SOCKET_NAME = 'daemon.sock'
+"""Name of the socket in the cache folder."""
+
+COMMANDS = {'log', 'show', 'status'}
+"""Commands which can be answered by the daemon."""
+
+
+def socket_path(path, renku_home):
+    """Return a path to the daemon socket of the repository."""
+    from renku.api.repository import RepositoryApiMixin
+
+    return Path(path) / renku_home / RepositoryApiMixin.CACHE / SOCKET_NAME
+
+
+def client_options(path, renku_home, use_external_storage):
+    """Return options identifying a client of the repository."""
+    return {
+        'path': str(Path(path).resolve().absolute()),
+        'renku_home': renku_home,
+        'use_external_storage': use_external_storage,
+    }
+
+
+def _send(sock, data):
+    """Send a JSON document terminated by a new line."""
+    sock.sendall(json.dumps(data).encode('utf-8') + b'\n')
+
+
+def _receive(fp):
+    """Read a JSON document terminated by a new line."""
+    line = fp.readline()
+    if not line:
+        raise ConnectionError('Connection closed.')
+    return json.loads(line.decode('utf-8'))
+
+
+def request(path, data):
+    """Send the request to the daemon and return its response.
+
+    Return ``None`` if no daemon is listening on the socket.
+    """
+    path = str(path)
+    if not os.path.exists(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        _send(sock, data)
+        with sock.makefile('rb') as fp:
+            return _receive(fp)
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def forward(ctx, path, renku_home, use_external_storage):
+    """Run the invoked subcommand in a daemon if one is running.
+
+    Return without doing anything if the daemon is not running or it can
+    not answer the command, so it is executed by the current process.
+    """
+    if ctx.invoked_subcommand not in COMMANDS or ctx.resilient_parsing:
+        return
+
+    response = request(
+        socket_path(path, renku_home), {
+            'args': ctx.meta.get(SUBCOMMAND_ARGS, []),
+            'cwd': os.getcwd(),
+            'color': ctx.color if ctx.color is not None else
+            not click.utils.should_strip_ansi(),
+            'options': client_options(
+                path, renku_home, use_external_storage
+            ),
+        }
+    )
+    if response is None or response.get('exit_code') is None:
+        return
+
+    if response.get('pager'):
+        from ._echo import echo_via_pager
+        echo_via_pager(response['output'], color=True)
+    else:
+        click.echo(response['output'], nl=False, color=True)
+    click.echo(response['error'], nl=False, err=True, color=True)
+    ctx.exit(response['exit_code'])
+
+
+def _signature(client):
+    """Return modification times of references and workflow names."""
+    git_dir = Path(client.repo.git_dir)
+    paths = [
+        git_dir / 'HEAD',
+        git_dir / 'packed-refs',
+        client.path / '.gitmodules',
+    ]
+    for root in (git_dir / 'refs', client.renku_path / 'refs'):
+        for dirpath, _, filenames in os.walk(str(root)):
+            paths.append(Path(dirpath))
+            paths.extend(Path(dirpath) / name for name in filenames)
+
+    result = []
+    for path in paths:
+        try:
+            result.append((str(path), path.stat().st_mtime_ns))
+        except OSError:
+            pass
+    return tuple(result)
+
+
+@attr.s
+class Daemon(object):
+    """Keep a client of the repository warm between commands.
+
+    The client is recreated when ``HEAD``, references or workflow names
+    change. Activities of the client are kept in memory and the status is
+    read from the repository cache, hence graphs are updated incrementally
+    after new commits.
+    """
+
+    cli = attr.ib()
+    options = attr.ib()
+    """Options used to create the client."""
+
+    stopped = attr.ib(default=False, init=False)
+    """Flag the daemon to stop after the current request."""
+
+    _client = attr.ib(default=None, init=False)
+    _signature = attr.ib(default=None, init=False)
+
+    @property
+    def client(self):
+        """Return a client reflecting the current state of the repository."""
+        if self._client is not None and \
+                _signature(self._client) == self._signature:
+            return self._client
+
+        from renku.api import LocalClient
+
+        from ._cache import keep_activities
+
+        self.close()
+        self._client = LocalClient(**self.options)
+        self._signature = _signature(self._client)
+        keep_activities(self._client)
+        return self._client
+
+    def close(self):
+        """Release the client and its activities."""
+        from ._cache import release_activities
+
+        if self._client is not None:
+            release_activities(self._client)
+            self._client = None
+
+    def accepts(self, args, cwd):
+        """Check if the command is read-only and runs in the repository."""
+        if not args or args[0] not in COMMANDS or not cwd:
+            return False
+
+        try:
+            Path(cwd).resolve().relative_to(self.options['path'])
+        except ValueError:
+            return False
+        return True
+
+    def handle(self, data):
+        """Invoke the command and return its output and exit code.
+
+        The exit code is ``None`` if the request was not answered, e.g. for
+        commands modifying the repository or directories outside of it.
+        """
+        if data.get('stop'):
+            self.stopped = True
+
+        if data.get('options') != self.options or \
+                not self.accepts(data.get('args'), data.get('cwd')):
+            return {'output': '', 'error': '', 'exit_code': None}
+
+        obj = self.client
+        stdout, stderr = io.StringIO(), io.StringIO()
+        exit_code = 0
+        pager = []
+
+        cwd = os.getcwd()
+        try:
+            os.chdir(data['cwd'])
+            with contextlib.redirect_stdout(stdout), \
+                    contextlib.redirect_stderr(stderr), \
+                    record_pager() as pager:
+                self.cli.main(
+                    args=data['args'],
+                    prog_name='renku',
+                    obj=obj,
+                    color=data.get('color'),
+                )
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else int(
+                e.code is not None
+            )
+        except Exception:
+            stderr.write(traceback.format_exc())
+            exit_code = 1
+        finally:
+            os.chdir(cwd)
+
+        return {
+            'output': stdout.getvalue(),
+            'error': stderr.getvalue(),
+            'exit_code': exit_code,
+            'pager': bool(pager),
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answer a single request."""
+
+    def handle(self):
+        """Read the request and send the response."""
+        try:
+            data = _receive(self.rfile)
+        except (ConnectionError, ValueError):
+            return
+        _send(self.request, self.server.daemon.handle(data))
+
+
+class Server(socketserver.UnixStreamServer):
+    """Serve requests one at a time on a Unix socket.
+
+    Commands change the working directory and the standard streams of the
+    process, hence they are never executed concurrently.
+    """
+
+    timeout = 1
+    """Check periodically whether the daemon was stopped."""
+
+    def __init__(self, path, daemon):
+        """Bind the socket."""
+        self.daemon = daemon
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        path = str(path)
+        if os.path.exists(path):
+            if request(path, {}) is not None:
+                raise OSError('Daemon is already running: {0}'.format(path))
+            os.unlink(path)
+        super().__init__(path, _Handler)
+
+    def serve(self):
+        """Handle requests until the daemon is stopped."""
+        while not self.daemon.stopped:
+            self.handle_request()
+
+    def server_close(self):
+        """Remove the socket and release the client."""
+        super().server_close()
+        self.daemon.close()
+        with contextlib.suppress(OSError):
+            os.unlink(self.server_address)
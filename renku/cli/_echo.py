@@ -17,6 +17,7 @@
 # limitations under the License.
 """Custom console echo."""
 
+import contextlib
 import functools
 import os
 
@@ -24,12 +25,33 @@ import click
 
 WARNING = click.style('Warning: ', bold=True, fg='yellow')
 
+_PAGER_RECORDS = []
+"""Lists recording outputs which were sent to the pager."""
+
+
+@contextlib.contextmanager
+def record_pager():
+    """Record whether an output is sent to the pager.
+
+    It is used to display the output of a command executed by another
+    process in a pager.
+    """
+    record = []
+    _PAGER_RECORDS.append(record)
+    try:
+        yield record
+    finally:
+        _PAGER_RECORDS.remove(record)
+
 
 def echo_via_pager(*args, **kwargs):
     """Display pager only if it does not fit in one terminal screen.
 
     NOTE: The feature is available only on ``less``-based pager.
     """
+    for record in _PAGER_RECORDS:
+        record.append(True)
+
     try:
         restore = 'LESS' not in os.environ
         os.environ.setdefault('LESS', '-iXFR')
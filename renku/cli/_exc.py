@@ -59,6 +59,8 @@ from urllib.parse import urlencode
 
 import click
 
+from ._group import ForwardingGroup, LazyGroup
+
 _BUG = click.style(
     'Ahhhhhhhh! You have found a bug. 🐞\n\n',
     fg='red',
@@ -79,7 +81,7 @@ if SENTRY_DSN:
         HAS_SENTRY = True
 
 
-class IssueFromTraceback(click.Group):
+class IssueFromTraceback(ForwardingGroup, LazyGroup):
     """Create an issue with formatted exception."""
 
     REPO_URL = 'https://github.com/SwissDataScienceCenter/renku-python'
@@ -27,7 +27,7 @@ def tabular(client, datasets=None):
     """Format datasets with a tabular output."""
     from renku.models._tabulate import tabulate
 
-    datasets = datasets or client.datasets
+    datasets = datasets or client.dataset_summaries
 
     click.echo(
         tabulate(
@@ -18,6 +18,7 @@
 """Serializers for graph data."""
 
 import functools
+import re
 
 import click
 
@@ -27,7 +28,12 @@ def ascii(graph):
     from .._ascii import DAG
     from .._echo import echo_via_pager
 
-    echo_via_pager(str(DAG(graph)))
+    def _lines():
+        """Yield lines as soon as they are rendered."""
+        for index, line in enumerate(DAG(graph)):
+            yield '\n' + line if index else line
+
+    echo_via_pager(_lines)
 
 
 def _jsonld(graph, format, *args, **kwargs):
@@ -45,35 +51,19 @@ def _jsonld(graph, format, *args, **kwargs):
 
 def dot(graph, simple=True, debug=False, landscape=False):
     """Format graph as a dot file."""
-    import sys
-
-    from rdflib import ConjunctiveGraph
-    from rdflib.plugin import register, Parser
-    from rdflib.tools.rdf2dot import rdf2dot
-
-    register('json-ld', Parser, 'rdflib_jsonld.parser', 'JsonLDParser')
-
-    g = ConjunctiveGraph().parse(
-        data=_jsonld(graph, 'expand'),
-        format='json-ld',
-    )
-
-    g.bind('prov', 'http://www.w3.org/ns/prov#')
-    g.bind('wfdesc', 'http://purl.org/wf4ever/wfdesc#')
-    g.bind('wf', 'http://www.w3.org/2005/01/wf/flow#')
-    g.bind('wfprov', 'http://purl.org/wf4ever/wfprov#')
+    stream = click.get_text_stream('stdout')
 
     if debug:
-        rdf2dot(g, sys.stdout)
+        _rdf2dot_debug(graph, stream)
         return
 
-    sys.stdout.write('digraph { \n node [ fontname="DejaVu Sans" ] ; \n ')
+    stream.write('digraph { \n node [ fontname="DejaVu Sans" ] ; \n ')
     if landscape:
-        sys.stdout.write('rankdir="LR" \n')
+        stream.write('rankdir="LR" \n')
     if simple:
-        _rdf2dot_simple(g, sys.stdout)
+        _dot_simple(graph, stream)
         return
-    _rdf2dot_reduced(g, sys.stdout)
+    _dot_reduced(graph, stream)
 
 
 # define the various dot options
@@ -83,177 +73,185 @@ dot_full_landscape = functools.partial(dot, simple=False, landscape=True)
 dot_debug = functools.partial(dot, debug=True)
 
 
-def _rdf2dot_simple(g, stream):
-    """Create a simple graph of processes and artifacts."""
-    from itertools import chain
+def _rdf2dot_debug(graph, stream):
+    """Create a dot graph of all triples using rdflib."""
+    from rdflib import ConjunctiveGraph
+    from rdflib.plugin import register, Parser
+    from rdflib.tools.rdf2dot import rdf2dot
 
-    import re
+    register('json-ld', Parser, 'rdflib_jsonld.parser', 'JsonLDParser')
 
-    path_re = re.compile(
-        r'file:///(?P<type>[a-zA-Z]+)/'
-        r'(?P<commit>\w+)'
-        r'(?P<path>.+)?'
+    g = ConjunctiveGraph().parse(
+        data=_jsonld(graph, 'expand'),
+        format='json-ld',
     )
 
-    inputs = g.query(
-        """
-        SELECT ?input ?role ?activity ?comment
-        WHERE {
-            ?activity (prov:qualifiedUsage/prov:entity) ?input .
-            ?activity prov:qualifiedUsage ?qual .
-            ?qual prov:hadRole ?role .
-            ?qual prov:entity ?input .
-            ?qual rdf:type ?type .
-            ?activity rdf:type wfprov:ProcessRun .
-            ?activity rdfs:comment ?comment .
-            FILTER NOT EXISTS {?activity rdf:type wfprov:WorkflowRun}
-        }
-        """
-    )
-    outputs = g.query(
-        """
-        SELECT ?activity ?role ?output ?comment
-        WHERE {
-            ?output (prov:qualifiedGeneration/prov:activity) ?activity .
-            ?output prov:qualifiedGeneration ?qual .
-            ?qual prov:hadRole ?role .
-            ?qual prov:activity ?activity .
-            ?qual rdf:type ?type .
-            ?activity rdf:type wfprov:ProcessRun ;
-                      rdfs:comment ?comment .
-            FILTER NOT EXISTS {?activity rdf:type wfprov:WorkflowRun}
-        }
-        """
-    )
+    for prefix, namespace in NAMESPACES.items():
+        g.bind(prefix, namespace)
 
-    activity_nodes = {}
-    artifact_nodes = {}
-    for source, role, target, comment, in chain(inputs, outputs):
-        # extract the pieces of the process URI
-        src_path = path_re.match(source).groupdict()
-        tgt_path = path_re.match(target).groupdict()
+    rdf2dot(g, stream)
 
-        # write the edge
-        stream.write(
-            '\t"{src_commit}:{src_path}" -> '
-            '"{tgt_commit}:{tgt_path}" '
-            '[label={role}] \n'.format(
-                src_commit=src_path['commit'][:5],
-                src_path=src_path.get('path') or '',
-                tgt_commit=tgt_path['commit'][:5],
-                tgt_path=tgt_path.get('path') or '',
-                role=role
-            )
-        )
-        if src_path.get('type') == 'commit':
-            activity_nodes.setdefault(source, {'comment': comment})
-            artifact_nodes.setdefault(target, {})
-        if tgt_path.get('type') == 'commit':
-            activity_nodes.setdefault(target, {'comment': comment})
-            artifact_nodes.setdefault(source, {})
-
-    # customize the nodes
-    for node, content in activity_nodes.items():
-        node_path = path_re.match(node).groupdict()
-        stream.write(
-            '\t"{commit}:{path}" '
-            '[shape=box label="#{commit}:{path}:{comment}"] \n'.format(
-                comment=content['comment'],
-                commit=node_path['commit'][:5],
-                path=node_path.get('path') or ''
-            )
-        )
-    for node, content in artifact_nodes.items():
-        node_path = path_re.match(node).groupdict()
+
+NAMESPACES = {
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'rdfs': 'http://www.w3.org/2000/01/rdf-schema#',
+    'xsd': 'http://www.w3.org/2001/XMLSchema#',
+    'dcterms': 'http://purl.org/dc/terms/',
+    'prov': 'http://www.w3.org/ns/prov#',
+    'wfdesc': 'http://purl.org/wf4ever/wfdesc#',
+    'wf': 'http://www.w3.org/2005/01/wf/flow#',
+    'wfprov': 'http://purl.org/wf4ever/wfprov#',
+}
+"""Namespaces used for shortening IRIs in dot graphs."""
+
+
+def _process_runs(graph):
+    """Yield process runs including the steps of workflow runs."""
+    from renku.models.provenance.activities import ProcessRun, WorkflowRun
+
+    stack = list(reversed(list(graph.activities.values())))
+    while stack:
+        activity = stack.pop()
+        if isinstance(activity, WorkflowRun):
+            stack.extend(reversed(list(activity.subprocesses.values())))
+        elif isinstance(activity, ProcessRun):
+            yield activity
+
+
+def _dot_simple(graph, stream):
+    """Create a simple graph of processes and artifacts.
+
+    Usages and generations of process runs are read directly from the
+    graph and nodes are written as soon as they are seen.
+    """
+    nodes = set()
+
+    def _node(obj):
+        """Return a name of the node identified by ``commit/path``."""
+        _, _, identifier = obj._id.partition('/')
+        commit, _, path = identifier.partition('/')
+        return '{0}:{1}'.format(commit[:5], '/' + path if path else '')
+
+    def _write_node(name, label):
+        """Write the node when it is seen for the first time."""
+        if name not in nodes:
+            nodes.add(name)
+            stream.write('\t"{0}" {1} \n'.format(name, label))
+
+    def _write_edge(source, target, role):
+        """Write the edge."""
         stream.write(
-            '\t"{commit}:{path}" '
-            '[label="#{commit}:{path}"] \n'.format(
-                commit=node_path['commit'][:5],
-                path=node_path.get('path') or ''
-            )
+            '\t"{0}" -> "{1}" [label="{2}"] \n'.format(source, target, role)
         )
+
+    for activity in _process_runs(graph):
+        name = _node(activity)
+        comment = activity._message.replace('"', '\\"')
+        _write_node(name, '[shape=box label="#{0}:{1}"]'.format(name, comment))
+
+        for usage in activity.qualified_usage:
+            if usage.role is None:
+                continue
+            entity = _node(usage.entity)
+            _write_edge(entity, name, usage.role)
+            _write_node(entity, '[label="#{0}"]'.format(entity))
+
+        for generation in activity.generated:
+            if generation.role is None:
+                continue
+            entity = _node(generation.entity)
+            _write_edge(name, entity, generation.role)
+            _write_node(entity, '[label="#{0}"]'.format(entity))
+
     stream.write('}\n')
 
 
-def _rdf2dot_reduced(g, stream):
-    """
-    A reduced dot graph.
+def _dot_reduced(graph, stream):
+    """Create a reduced dot graph of all triples.
+
+    Triples are generated one activity at a time from the expanded JSON-LD
+    and edges are written immediately, while the types and the fields of
+    nodes are written at the end.
 
     Adapted from original source:
     https://rdflib.readthedocs.io/en/stable/_modules/rdflib/tools/rdf2dot.html
     """
-    import cgi
     import collections
+    import html
 
-    import rdflib
+    from renku.models._rdf import NQuadsWriter, RDF_TYPE, literal
 
-    from rdflib.tools.rdf2dot import LABEL_PROPERTIES, NODECOLOR
+    rdfs_label = NAMESPACES['rdfs'] + 'label'
+    is_part_of = NAMESPACES['dcterms'] + 'isPartOf'
+    was_informed_by = NAMESPACES['prov'] + 'wasInformedBy'
 
     types = collections.defaultdict(set)
     fields = collections.defaultdict(set)
+    labels = {}
     nodes = {}
+    edges = set()
 
     def node(x):
         """Return a name of the given node."""
         return nodes.setdefault(x, 'node{0}'.format(len(nodes)))
 
-    def label(x, g):
+    def qname(x):
+        """Shorten the IRI using known namespaces."""
+        for prefix, namespace in NAMESPACES.items():
+            if x.startswith(namespace) and len(x) > len(namespace):
+                return prefix + ':' + x[len(namespace):]
+        return x
+
+    def label(x):
         """Generate a label for the node."""
-        for labelProp in LABEL_PROPERTIES:
-            label_ = g.value(x, labelProp)
-            if label_:
-                return label_
-
-        try:
-            return g.namespace_manager.compute_qname(x)[2]
-        except Exception:
+        if x in labels:
+            return labels[x]
+        if x.startswith('_:'):
             return x
+        return re.split('[/#]', x.rstrip('/#'))[-1] or x
 
-    def formatliteral(l, g):
+    def formatliteral(value):
         """Format and escape literal."""
-        v = cgi.escape(l)
-        if l.datatype:
-            return '&quot;%s&quot;^^%s' % (v, qname(l.datatype, g))
-        elif l.language:
-            return '&quot;%s&quot;@%s' % (v, l.language)
+        data, datatype = literal(value)
+        v = html.escape(data, quote=False)
+        if datatype:
+            return '&quot;%s&quot;^^%s' % (v, qname(datatype))
         return '&quot;%s&quot;' % v
 
-    def qname(x, g):
-        """Compute qname."""
-        try:
-            q = g.compute_qname(x)
-            return q[0] + ":" + q[2]
-        except Exception:
-            return x
-
     def color(p):
         """Choose node color."""
-        return "BLACK"
-
-    for s, p, o in g:
-        sn = node(s)
-        if p == rdflib.RDFS.label:
-            continue
-
-        # inject the type predicate into the node itself
-        if p == rdflib.RDF.type:
-            types[sn].add((qname(p, g), cgi.escape(o)))
-            continue
-        if p == rdflib.term.URIRef('http://purl.org/dc/terms/isPartOf'):
-            fields[sn].add((qname(p, g), cgi.escape(o)))
-            continue
-        if p == rdflib.term.URIRef('http://www.w3.org/ns/prov#wasInformedBy'):
-            continue
-
-        if isinstance(o, (rdflib.URIRef, rdflib.BNode)):
-            on = node(o)
-            opstr = (
-                '\t%s -> %s [ color=%s, label=< <font point-size="12" '
-                'color="#336633">%s</font> > ] ;\n'
-            )
-            stream.write(opstr % (sn, on, color(p), qname(p, g)))
-        else:
-            fields[sn].add((qname(p, g), formatliteral(o, g)))
+        return 'BLACK'
+
+    writer = NQuadsWriter()
+    for item in _expanded(graph):
+        for s, p, o in writer.triples(item):
+            sn = node(s)
+            if p == rdfs_label:
+                labels.setdefault(s, literal(o)[0])
+                continue
+
+            # inject the type predicate into the node itself
+            if p == RDF_TYPE:
+                types[sn].add((qname(p), html.escape(o, quote=False)))
+                continue
+            if p == is_part_of:
+                fields[sn].add((qname(p), html.escape(o, quote=False)))
+                continue
+            if p == was_informed_by:
+                continue
+
+            if isinstance(o, str):
+                on = node(o)
+                if (sn, p, on) in edges:
+                    continue
+                edges.add((sn, p, on))
+                opstr = (
+                    '\t%s -> %s [ color=%s, label=< <font point-size="12" '
+                    'color="#336633">%s</font> > ] ;\n'
+                )
+                stream.write(opstr % (sn, on, color(p), qname(p)))
+            else:
+                fields[sn].add((qname(p), formatliteral(o)))
 
     for u, n in nodes.items():
         stream.write(u"# %s %s\n" % (u, n))
@@ -273,7 +271,7 @@ def _rdf2dot_reduced(g, stream):
             '<font point-size="12" color="#6666ff">%s</font></td>'
             '</tr>%s</table> > ] \n'
         )
-        stream.write(opstr % (n, NODECOLOR, label(u, g), u, u, ''.join(f)))
+        stream.write(opstr % (n, 'black', label(u), u, u, ''.join(f)))
 
     stream.write('}\n')
 
@@ -315,6 +313,34 @@ def jsonld_graph(graph):
     click.echo(_jsonld(graph, 'flatten'))
 
 
+def _expanded(graph):
+    """Yield expanded JSON-LD nodes one activity at a time."""
+    from renku.models._jsonld import asjsonld
+    from renku.models._rdf import expand
+
+    for activity in graph.activities.values():
+        for node in expand(asjsonld(activity)):
+            yield node
+
+
+def jsonld_stream(graph):
+    """Format graph as newline-delimited expanded JSON-LD."""
+    import json
+
+    for node in _expanded(graph):
+        click.echo(json.dumps(node, sort_keys=True))
+
+
+def nq(graph):
+    """Format graph as N-Quads written one activity at a time."""
+    from renku.models._rdf import NQuadsWriter
+
+    writer = NQuadsWriter()
+    for node in _expanded(graph):
+        for line in writer.lines(node):
+            click.echo(line)
+
+
 def nt(graph):
     """Format graph as n-tuples."""
     from rdflib import ConjunctiveGraph
@@ -354,7 +380,9 @@ FORMATS = {
     'dot-debug': dot_debug,
     'json-ld': jsonld,
     'json-ld-graph': jsonld_graph,
+    'json-ld-stream': jsonld_stream,
     'Makefile': makefile,
+    'nq': nq,
     'nt': nt,
     'rdf': rdf,
 }
@@ -39,6 +39,22 @@ def get_git_home(path='.'):
     return Repo(path, search_parent_directories=True).working_dir
 
 
+def show_git_calls(ctx, param, value):
+    """Print number of Git calls when the command finishes."""
+    if not value or ctx.resilient_parsing:
+        return
+
+    from renku.api._git import GIT_CALLS
+
+    def _print_git_calls():
+        """Print Git calls grouped by the subcommand."""
+        click.echo('Git calls: {0}'.format(sum(GIT_CALLS.values())), err=True)
+        for name, count in GIT_CALLS.most_common():
+            click.echo('  {0}: {1}'.format(name, count), err=True)
+
+    ctx.call_on_close(_print_git_calls)
+
+
 def set_git_isolation(value):
     """Set Git isolation."""
     ctx = click.get_current_context()
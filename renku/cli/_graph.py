@@ -17,8 +17,9 @@
 # limitations under the License.
 """Graph builder."""
 
+import itertools
 import os
-from collections import OrderedDict, defaultdict, deque
+from collections import OrderedDict, defaultdict
 
 import attr
 
@@ -32,6 +33,10 @@ from renku.models.cwl.workflow import Workflow
 from renku.models.provenance import Activity, Generation, ProcessRun, Usage
 from renku.models.provenance.entities import Collection, Entity, Process
 
+from ._cache import ActivityCache, StatusCache
+from ._options import default_jobs
+from ._staleness import Staleness
+
 LINK_CWL = CommandLineTool(
     baseCommand=['true'],
     requirements=[
@@ -59,6 +64,15 @@ LINK_CWL = CommandLineTool(
 )
 
 
+def _in_tree(commit, path):
+    """Check if the path exists in the commit."""
+    try:
+        commit.tree / path
+        return True
+    except KeyError:
+        return False
+
+
 def _safe_path(filepath, can_be_cwl=False):
     """Check if the path should be used in output."""
     # Should not be in ignore paths.
@@ -81,18 +95,24 @@ class Graph(object):
 
     client = attr.ib()
     activities = attr.ib(default=attr.Factory(dict))
+    jobs = attr.ib(default=attr.Factory(default_jobs), converter=int)
+    """Number of commits processed concurrently."""
+
     generated = attr.ib(default=attr.Factory(dict))
 
     _sorted_commits = attr.ib(default=attr.Factory(list))
     _latest_commits = attr.ib(default=attr.Factory(dict))
     _nodes = attr.ib()
-    _need_update = attr.ib(default=attr.Factory(dict))
 
     cwl_prefix = attr.ib(init=False)
+    cache = attr.ib(init=False)
+    staleness = attr.ib(init=False)
 
     def __attrs_post_init__(self):
         """Derive basic informations."""
         self.cwl_prefix = self.client.cwl_prefix
+        self.cache = ActivityCache(self.client)
+        self.staleness = Staleness(self)
 
     @_nodes.default
     def default_nodes(self):
@@ -104,12 +124,6 @@ class Graph(object):
             try:
                 activity = self.activities[commit]
 
-                # for node in reversed(list(activity.nodes)):
-                #     key = (node.commit, node.path)
-                #     if key in nodes:
-                #         del nodes[key]
-                #     nodes[key] = node
-
                 nodes.update(((node.commit, node.path), node)
                              for node in reversed(list(activity.nodes)))
 
@@ -126,33 +140,7 @@ class Graph(object):
 
     def need_update(self, node):
         """Return out-dated nodes."""
-        if node is None:
-            return
-
-        skip = True
-        if isinstance(node, ProcessRun):
-            node = node.association.plan
-            skip = False
-
-        if node._id in self._need_update:
-            return self._need_update[node._id]
-
-        latest = self.latest(node)
-        if latest:
-            return self._need_update.setdefault(node._id, [node])
-
-        need_update_ = []
-
-        for parent in self.parents(node):
-            # Skip Collections if it is not an input
-            if skip and isinstance(parent, Collection):
-                continue
-
-            parent_updates = self.need_update(parent)
-            if parent_updates:
-                need_update_.extend(parent_updates)
-
-        return self._need_update.setdefault(node._id, need_update_)
+        return self.staleness.reasons(node)
 
     def parents(self, node):
         """Return parents for a given node."""
@@ -199,22 +187,32 @@ class Graph(object):
     def latest(self, node):
         """Return a latest commit where the node was modified."""
         if node.path and node.path not in self._latest_commits:
+            self.prefetch_latest([node])
+
+        latest = self._latest_commits.get(node.path)
+        if latest and latest != node.commit:
+            return latest
+
+    def prefetch_latest(self, nodes):
+        """Find latest commits of all paths of the given nodes.
+
+        Paths are looked up in the history index of their client which is
+        read once, instead of creating an entity for every path.
+        """
+        for node in nodes:
+            path = node.path
+            if not path or path in self._latest_commits:
+                continue
+
+            client = node.client
             try:
-                latest = Usage.from_revision(
-                    node.client,
-                    path=node.path,
-                    # TODO support range queries
-                    # revision='{0}'.format(node.commit.hexsha),
-                ).commit
+                _, latest, _ = client.resolve_in_submodules(
+                    client.find_previous_commit(path), path
+                )
             except KeyError:
                 latest = None
 
-            self._latest_commits[node.path] = latest
-        else:
-            latest = self._latest_commits.get(node.path)
-
-        if latest and latest != node.commit:
-            return latest
+            self._latest_commits[path] = latest
 
     @property
     def nodes(self):
@@ -231,18 +229,22 @@ class Graph(object):
         """Return a relative path based on the client configuration."""
         return os.path.relpath(str(self.client.path / path))
 
+    def index_paths(self, revision='HEAD'):
+        """Return paths from the index or from the tree of a revision."""
+        if revision == 'HEAD':
+            index = self.client.repo.index
+        else:
+            from git import IndexFile
+            index = IndexFile.from_tree(self.client.repo, revision)
+
+        return (path for path, _ in index.entries.keys())
+
     def dependencies(self, revision='HEAD', paths=None):
         """Return dependencies from a revision or paths."""
         result = []
 
         if not paths:
-            if revision == 'HEAD':
-                index = self.client.repo.index
-            else:
-                from git import IndexFile
-                index = IndexFile.from_tree(self.client.repo, revision)
-
-            paths = (path for path, _ in index.entries.keys())
+            paths = self.index_paths(revision=revision)
 
         for path in paths:
             try:
@@ -258,8 +260,13 @@ class Graph(object):
 
         return result
 
-    def process_dependencies(self, dependencies, visited=None):
-        """Process given dependencies."""
+    def process_dependencies(self, dependencies, visited=None, included=None):
+        """Process given dependencies.
+
+        :param visited: Commits that should not be processed.
+        :param included: SHAs of commits in a revision range. Other commits
+            from this repository are boundaries that are not processed.
+        """
         for dependency in dependencies:
             # We can't simply reuse information from submodules
             if dependency.client != self.client:
@@ -267,41 +274,67 @@ class Graph(object):
             self._latest_commits[dependency.path] = dependency.commit
 
         visited = visited or set()
-        queue = deque(dependencies)
+        frontier = list(dependencies)
 
-        while queue:
-            processing = queue.popleft()
+        # Expand the frontier level by level so commits missing in the cache
+        # can be read concurrently while activities keep the same order.
+        try:
+            self._process_frontier(frontier, visited, included)
+        finally:
+            # Workers reading the cache are shared by all levels.
+            self.cache.close()
 
-            if processing.commit in visited:
-                continue
+        from renku.models._sort import topological
+        self._sorted_commits = topological(
+            {
+                commit: activity.parents
+                for commit, activity in self.activities.items()
+            },
+            # Newer commits go first.
+            key=lambda commit: -commit.committed_date,
+        )
+        self._nodes = self.default_nodes()
 
-            # Mark as visited:
-            visited.add(processing.commit)
+    def _process_frontier(self, frontier, visited, included):
+        """Add activities of the frontier and their parents level by level."""
+        while frontier:
+            processing = []
+            for dependency in frontier:
+                if included is not None and \
+                        dependency.client == self.client and \
+                        dependency.commit.hexsha not in included:
+                    continue
 
-            # Do the node processing here:
-            activity = Activity.from_git_commit(
-                processing.commit,
-                client=processing.client,
-            )
+                if dependency.commit not in visited:
+                    # Mark as visited:
+                    visited.add(dependency.commit)
+                    processing.append(dependency)
 
-            if activity is None:
-                continue
+            commits = [
+                dependency.commit for dependency in processing
+                if dependency.client == self.client
+            ]
+            self.cache.prefetch(commits, jobs=self.jobs)
+
+            frontier = []
+            for dependency in processing:
+                # Do the node processing here:
+                activity = self.cache.from_git_commit(
+                    dependency.commit,
+                    client=dependency.client,
+                )
 
-            self.activities[activity.commit] = activity
+                if activity is None:
+                    continue
 
-            # Iterate over parents.
-            if isinstance(activity, ProcessRun):
-                for entity in activity.qualified_usage:
-                    for member in entity.entities:
-                        if member.commit not in visited:
-                            queue.append(member)
+                self.activities[activity.commit] = activity
 
-        from renku.models._sort import topological
-        self._sorted_commits = topological({
-            commit: activity.parents
-            for commit, activity in self.activities.items()
-        })
-        self._nodes = self.default_nodes()
+                # Iterate over parents.
+                if isinstance(activity, ProcessRun):
+                    for entity in activity.qualified_usage:
+                        for member in entity.entities:
+                            if member.commit not in visited:
+                                frontier.append(member)
 
     def build(
         self, revision='HEAD', paths=None, dependencies=None, can_be_cwl=False
@@ -312,12 +345,13 @@ class Graph(object):
         if dependencies is None:
             dependencies = self.dependencies(revision=revision, paths=paths)
 
-        ignore = {
-            commit
-            for commit in self.client.repo.iter_commits(interval.start)
-        } if interval.start else set()
+        # Only commits in the range are listed instead of all commits
+        # preceding its start.
+        included = set(
+            self.client.repo.git.rev_list(str(interval)).split()
+        ) if interval.start else None
 
-        self.process_dependencies(dependencies, visited=ignore)
+        self.process_dependencies(dependencies, included=included)
 
         return {
             self._nodes.get((dependency.commit, dependency.path), dependency)
@@ -334,8 +368,8 @@ class Graph(object):
                 paths |= {path for path in activity.outputs.keys() if path}
         return paths
 
-    def build_status(self, revision='HEAD', can_be_cwl=False):
-        """Return files from the revision grouped by their status."""
+    def _build_status(self, dependencies, can_be_cwl=False):
+        """Return status and dependency edges of generated files."""
         status = {
             'up-to-date': {},
             'outdated': {},
@@ -343,7 +377,6 @@ class Graph(object):
             'deleted': {},
         }
 
-        dependencies = self.dependencies(revision=revision)
         current_files = self.build(
             dependencies=dependencies,
             can_be_cwl=can_be_cwl,
@@ -351,6 +384,7 @@ class Graph(object):
 
         # TODO check only outputs
         paths = {}
+        edges = []
         for commit in reversed(self._sorted_commits):
             activity = self.activities.get(commit)
 
@@ -360,6 +394,13 @@ class Graph(object):
                 for node in nodes:
                     paths[node.path] = node
 
+                edges.append([
+                    sorted({node.path
+                            for node in nodes}),
+                    sorted({usage.path
+                            for usage in activity.qualified_usage}),
+                ])
+
         # First find all up-to-date nodes.
         for node in paths.values():
             # for node in current_files:
@@ -399,6 +440,158 @@ class Graph(object):
             not ((self.client.path / node.path).exists() or
                  (self.client.path / node.path).is_dir())
         }
+        return status, edges
+
+    def _update_status(
+        self, status, edges, changed, invalidated, commit, can_be_cwl
+    ):
+        """Evaluate the invalidated paths again and merge the results."""
+        paths = [
+            str(self.client.path / path)
+            for path in sorted(changed | invalidated)
+            if _in_tree(commit, path)
+        ]
+        new_status, new_edges = self._build_status(
+            self.dependencies(revision=commit.hexsha, paths=paths),
+            can_be_cwl=can_be_cwl,
+        )
+
+        retained = (
+            set(status['up-to-date']) | set(status['outdated'])
+        ) - invalidated
+        for key in ('up-to-date', 'outdated'):
+            status[key] = {
+                path: value
+                for path, value in status[key].items() if path in retained
+            }
+            status[key].update({
+                path: value
+                for path, value in new_status[key].items()
+                if path not in retained
+            })
+
+        edges = [
+            edge for edge in edges if not invalidated.intersection(edge[0])
+        ]
+        edges.extend(edge for edge in new_edges if edge not in edges)
+
+        status['deleted'].update(new_status['deleted'])
+        return status, edges
+
+    def _deleted(self, status, edges, revision, can_be_cwl=False):
+        """Return used files missing in the index and the working tree."""
+        used_paths = {path for edge in edges for path in edge[0] + edge[1]}
+        nodes = {node.path: node for node in self.nodes}
+        nodes.update(status['deleted'])
+
+        # Keep deleted files used by remaining activities.
+        candidates = used_paths | {
+            path
+            for path in status['deleted'] if any(
+                str(parent) in used_paths
+                for parent in itertools.chain([Path(path)],
+                                              Path(path).parents)
+            )
+        }
+        candidates -= set(self.index_paths(revision=revision))
+
+        deleted = {}
+        for path in sorted(candidates):
+            if not _safe_path(path, can_be_cwl=can_be_cwl) or (
+                self.client.path / path
+            ).exists():
+                continue
+
+            node = nodes.get(path)
+            if node is None:
+                try:
+                    commit = self.client.find_previous_commit(
+                        path, revision=revision
+                    )
+                except KeyError:
+                    continue
+                node = Entity(client=self.client, commit=commit, path=path)
+            deleted[path] = node
+        return deleted
+
+    def _multiple_versions(self, status, commit):
+        """Return inputs of outdated files used in different versions."""
+        multiple_versions = defaultdict(dict)
+
+        for need_update in status['outdated'].values():
+            for node in need_update:
+                multiple_versions[node.path].setdefault(node.commit, node)
+
+        for path, versions in multiple_versions.items():
+            if versions and _safe_path(path) and _in_tree(commit, path):
+                current = self.client.find_previous_commit(
+                    path, revision=commit.hexsha
+                )
+                versions.setdefault(
+                    current,
+                    Entity(client=self.client, commit=current, path=path),
+                )
+
+        return {
+            path: set(versions.values())
+            for path, versions in multiple_versions.items()
+            if len(versions) > 1
+        }
+
+    def build_status(self, revision='HEAD', can_be_cwl=False, paths=None):
+        """Return files from the revision grouped by their status.
+
+        The status is stored together with the evaluated revision and next
+        time only files depending on modified paths are evaluated again.
+
+        If paths are given, only their ancestry is evaluated and the status
+        is returned for the given paths.
+        """
+        if paths:
+            status, _ = self._build_status(
+                self.dependencies(revision=revision, paths=paths),
+                can_be_cwl=can_be_cwl,
+            )
+            paths = {self.normalize_path(path) for path in paths}
+            for key in ('up-to-date', 'outdated'):
+                status[key] = {
+                    path: value
+                    for path, value in status[key].items() if path in paths
+                }
+            return status
+
+        cache = StatusCache(self.client, can_be_cwl=can_be_cwl)
+        commit = self.client.repo.rev_parse(revision)
+
+        # The index is used instead of the tree only for the HEAD revision.
+        staged = cache.staged(commit) if revision == 'HEAD' else None
+        stored = cache.load()
+        changed = cache.changed_paths(stored, commit, staged=staged)
+
+        if changed is None:
+            status, edges = self._build_status(
+                self.dependencies(revision=revision),
+                can_be_cwl=can_be_cwl,
+            )
+        else:
+            status, edges = cache.restore(stored)
+            if changed:
+                status, edges = self._update_status(
+                    status,
+                    edges,
+                    changed,
+                    cache.invalidated(stored, changed),
+                    commit,
+                    can_be_cwl=can_be_cwl,
+                )
+            status['deleted'] = self._deleted(
+                status, edges, revision, can_be_cwl=can_be_cwl
+            )
+            status['multiple-versions'] = self._multiple_versions(
+                status, commit
+            )
+
+        cache.dump(commit, status, edges, staged=staged)
         return status
 
     def siblings(self, node):
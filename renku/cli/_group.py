@@ -28,3 +28,99 @@ class OptionalGroup(click.Group):
         if args and args[0] in self.commands:
             args.insert(0, '')
         super(OptionalGroup, self).parse_args(ctx, args)
+
+
+SUBCOMMAND_ARGS = 'renku.subcommand_args'
+"""Key of the subcommand arguments in the context meta data."""
+
+
+class ForwardingGroup(click.Group):
+    """Keep arguments of the invoked subcommand in the context.
+
+    Click consumes them before the group callback is executed, hence they
+    are not available to callbacks forwarding the command elsewhere.
+    """
+
+    def invoke(self, ctx):
+        """Store arguments of the subcommand and invoke it."""
+        ctx.meta[SUBCOMMAND_ARGS] = ctx.protected_args + ctx.args
+        return super().invoke(ctx)
+
+
+class LazyGroup(click.Group):
+    """Import subcommands only when they are needed.
+
+    Subcommands are registered as names of modules and attributes, hence
+    short commands do not pay for importing all other commands. The help
+    message reads docstrings of subcommands from their source code.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        """Store lazily loaded subcommands."""
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def add_lazy_command(self, import_path, name):
+        """Register a subcommand defined as ``'module:attribute'``."""
+        self.lazy_commands[name] = import_path
+
+    def lazy_help(self, name):
+        """Return help of the subcommand without importing it."""
+        import ast
+        from importlib.util import find_spec
+
+        module, attribute = self.lazy_commands[name].split(':')
+        spec = find_spec(module, package=__package__)
+        source = spec.loader.get_source(spec.name) if spec else None
+        if source is None:
+            return ''
+
+        for node in ast.parse(source).body:
+            if isinstance(node, ast.FunctionDef) and node.name == attribute:
+                # Click ignores the rest of the help after a form feed.
+                return (ast.get_docstring(node) or '').split('\f', 1)[0]
+        return ''
+
+    def list_commands(self, ctx):
+        """Return names of loaded and lazy subcommands."""
+        return sorted(
+            set(super().list_commands(ctx)) | set(self.lazy_commands)
+        )
+
+    def get_command(self, ctx, name):
+        """Import the subcommand if it has not been loaded yet."""
+        if name not in self.commands and name in self.lazy_commands:
+            import importlib
+
+            module, attribute = self.lazy_commands[name].split(':')
+            command = getattr(
+                importlib.import_module(module, package=__package__),
+                attribute,
+            )
+            self.add_command(command, name)
+        return super().get_command(ctx, name)
+
+    def format_commands(self, ctx, formatter):
+        """List subcommands without importing the lazy ones."""
+        commands = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                command = self.commands[name]
+                if not command.hidden:
+                    commands.append((name, command))
+            elif name in self.lazy_commands:
+                commands.append((name, self.lazy_help(name)))
+
+        if not commands:
+            return
+
+        limit = formatter.width - 6 - max(len(name) for name, _ in commands)
+        rows = [(
+            name,
+            command.get_short_help_str(limit)
+            if isinstance(command, click.Command) else
+            click.utils.make_default_short_help(command, limit),
+        ) for name, command in commands]
+
+        with formatter.section('Commands'):
+            formatter.write_dl(rows)
@@ -17,6 +17,8 @@
 # limitations under the License.
 """Command line options."""
 
+import os
+
 import click
 
 from ._git import set_git_isolation
@@ -189,3 +191,22 @@ option_use_external_storage = click.option(
     default=True,
     help='Use an external file storage service.'
 )
+
+
+def default_jobs():
+    """Return number of concurrent jobs from ``RENKU_JOBS``.
+
+    The number of CPUs is used if the variable is not a positive integer.
+    """
+    import warnings
+
+    value = os.environ.get('RENKU_JOBS')
+    if value:
+        try:
+            jobs = int(value)
+        except ValueError:
+            jobs = 0
+        if jobs > 0:
+            return jobs
+        warnings.warn('Invalid RENKU_JOBS value: {0}'.format(value))
+    return os.cpu_count() or 1
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Propagate staleness of inputs through the provenance graph."""
+
+import attr
+
+from renku.models.provenance import ProcessRun
+from renku.models.provenance.entities import Collection
+
+
+@attr.s
+class Staleness(object):
+    """Find outdated nodes and the inputs causing them to be outdated.
+
+    Every visited node gets an integer index and the outdated inputs of a
+    node are stored as a set of these indices. Equal sets are interned, so
+    a node with a single outdated parent shares the set of its parent. The
+    graph is walked once without recursion and the result of each node is
+    reused by all its descendants.
+    """
+
+    graph = attr.ib()
+
+    _ids = attr.ib(default=attr.Factory(dict), init=False)
+    """Map node identifiers to indices."""
+
+    _nodes = attr.ib(default=attr.Factory(list), init=False)
+    """List of visited nodes."""
+
+    _parents = attr.ib(default=attr.Factory(list), init=False)
+    """Indices of parents for each visited node."""
+
+    _reasons = attr.ib(default=attr.Factory(list), init=False)
+    """Set of outdated inputs for each visited node."""
+
+    _interned = attr.ib(default=attr.Factory(dict), init=False)
+    """Map sets of outdated inputs to their shared instances."""
+
+    def _index(self, node):
+        """Return an index of the node."""
+        if isinstance(node, ProcessRun):
+            node = node.association.plan
+
+        index = self._ids.get(node._id)
+        if index is None:
+            index = self._ids[node._id] = len(self._nodes)
+            self._nodes.append(node)
+            self._parents.append(None)
+            self._reasons.append(None)
+        return index
+
+    def _evaluate(self, root):
+        """Calculate reasons for the node and all its ancestors."""
+        reasons = self._reasons
+        visiting = {root}
+        stack = [(root, iter(self._expand(root)))]
+
+        while stack:
+            index, parents = stack[-1]
+
+            for parent in parents:
+                parent_index = self._index(parent)
+                self._parents[index].append(parent_index)
+
+                if reasons[parent_index] is None and \
+                        parent_index not in visiting:
+                    visiting.add(parent_index)
+                    stack.append(
+                        (parent_index, iter(self._expand(parent_index)))
+                    )
+                    break
+            else:
+                stack.pop()
+                visiting.discard(index)
+
+                if reasons[index] is None:
+                    reasons[index] = self._union(
+                        reasons[parent_index]
+                        for parent_index in self._parents[index]
+                    )
+
+    def _union(self, sets):
+        """Return a shared union of the given sets of outdated inputs."""
+        result = frozenset()
+        for reasons in sets:
+            if not reasons or reasons is result:
+                continue
+            if result <= reasons:
+                result = reasons
+            elif not reasons <= result:
+                result = result | reasons
+        return self._interned.setdefault(result, result)
+
+    def _expand(self, index):
+        """Return parents of a node that is not at its latest version."""
+        node = self._nodes[index]
+        self._parents[index] = []
+
+        if self.graph.latest(node):
+            self._reasons[index] = self._union([frozenset([index])])
+            return []
+
+        # Skip Collections if they are not inputs.
+        return [
+            parent for parent in self.graph.parents(node)
+            if not isinstance(parent, Collection)
+        ]
+
+    def reasons(self, node):
+        """Return outdated nodes used to generate the given node."""
+        if node is None:
+            return
+
+        index = self._index(node)
+        if self._reasons[index] is None:
+            self._evaluate(index)
+
+        return [self._nodes[reason] for reason in sorted(self._reasons[index])]
@@ -23,8 +23,6 @@ import sys
 
 import attr
 import click
-import lockfile
-import requests
 
 
 def print_version(ctx, param, value):
@@ -39,6 +37,8 @@ def print_version(ctx, param, value):
 
 def find_latest_version(name, allow_prereleases=False):
     """Find a latest version on PyPI."""
+    import requests
+
     response = requests.get(
         'https://pypi.org/pypi/{name}/json'.format(name=name)
     )
@@ -109,6 +109,8 @@ class VersionCache:
 
     def dump(self, app_name):
         """Store information in a cache."""
+        import lockfile
+
         cache = self._cache(app_name)
 
         # Attempt to write out our version check file
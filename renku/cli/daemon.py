@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Keep the repository loaded in a long-lived process.
+
+Start the daemon
+~~~~~~~~~~~~~~~~
+
+Commands such as ``renku status``, ``renku show`` and ``renku log`` need to
+load the repository and its provenance graph on every invocation. You can
+start a daemon that keeps them loaded in memory:
+
+.. code-block:: console
+
+    $ renku daemon start
+
+While the daemon is running, these commands are answered by it via a Unix
+socket in the ``.renku/cache`` folder. The daemon reloads the repository
+when ``HEAD`` or any of the references change. Commands are executed by the
+current process as usual if no daemon is running.
+
+Stop the daemon
+~~~~~~~~~~~~~~~
+
+Press ``Ctrl-C`` in the terminal running the daemon or run:
+
+.. code-block:: console
+
+    $ renku daemon stop
+
+"""
+
+import click
+
+from ._client import pass_local_client
+
+
+@click.group()
+def daemon():
+    """Manage a daemon answering commands for the repository."""
+
+
+@daemon.command()
+@pass_local_client
+@click.pass_context
+def start(ctx, client):
+    """Start the daemon in the foreground."""
+    from . import _daemon
+
+    options = _daemon.client_options(
+        client.path, client.renku_home, client.use_external_storage
+    )
+    path = _daemon.socket_path(options['path'], options['renku_home'])
+
+    try:
+        server = _daemon.Server(
+            path, _daemon.Daemon(cli=ctx.find_root().command, options=options)
+        )
+    except OSError as e:
+        raise click.ClickException(str(e))
+
+    click.echo('Listening on {0}'.format(path), err=True)
+    with server:
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+
+
+@daemon.command()
+@pass_local_client
+def stop(client):
+    """Stop the running daemon."""
+    from . import _daemon
+
+    path = _daemon.socket_path(client.path, client.renku_home)
+    if _daemon.request(path, {'stop': True}) is None:
+        raise click.ClickException('Daemon is not running.')
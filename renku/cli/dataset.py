@@ -76,14 +76,26 @@ will yield:
     data/
       my-dataset/
         datafile
+
+Several files, directories and URLs can be added at once. Files are copied
+or downloaded concurrently by one worker per CPU by default, which can be
+changed with the ``--jobs`` option or the ``RENKU_JOBS`` environment
+variable:
+
+.. code-block:: console
+
+    $ renku dataset add my-dataset --jobs 8 data-folder http://data-url
 """
 
+import time
+
 import click
 from click import BadParameter
 
 from ._client import pass_local_client
 from ._echo import progressbar
 from ._format.datasets import FORMATS as DATASETS_FORMATS
+from ._options import default_jobs
 
 
 @click.group(invoke_without_command=True)
@@ -137,24 +149,58 @@ def create(client, name):
 @click.option(
     '--force', is_flag=True, help='Allow adding otherwise ignored files.'
 )
+@click.option(
+    '-j',
+    '--jobs',
+    default=default_jobs,
+    type=click.IntRange(min=1),
+    show_default='number of CPUs or RENKU_JOBS',
+    help='Number of files copied or downloaded concurrently.'
+)
 @pass_local_client(clean=True, commit=True)
-def add(client, name, urls, nocopy, relative_to, target, force):
+def add(client, name, urls, nocopy, relative_to, target, force, jobs):
     """Add data to a dataset."""
     try:
         with client.with_dataset(name=name) as dataset:
             target = target if target else None
-            with progressbar(urls, label='Adding data to dataset') as bar:
-                for url in bar:
-                    client.add_data_to_dataset(
-                        dataset,
-                        url,
-                        nocopy=nocopy,
-                        target=target,
-                        relative_to=relative_to,
-                        force=force,
-                    )
-    except FileNotFoundError:
-        raise BadParameter('Could not process {0}'.format(url))
+            client.add_data_to_dataset(
+                dataset,
+                *urls,
+                nocopy=nocopy,
+                target=target,
+                relative_to=relative_to,
+                force=force,
+                jobs=jobs,
+                progress=_progress,
+            )
+    except FileNotFoundError as e:
+        raise BadParameter(
+            'Could not process {0}'.format(e.filename or e)
+        )
+
+
+def _progress(sizes, length):
+    """Show the number of transferred files and the throughput."""
+    start = time.time()
+    transferred = [0]
+
+    def _sizes():
+        """Count transferred bytes."""
+        for size in sizes:
+            transferred[0] += size
+            yield size
+
+    def _throughput(_):
+        """Format the average throughput."""
+        elapsed = max(time.time() - start, 1e-3)
+        return '{0:.1f} MB/s'.format(transferred[0] / elapsed / 2**20)
+
+    return progressbar(
+        _sizes(),
+        length=length,
+        label='Adding data to dataset',
+        item_show_func=_throughput,
+    )
 
 
 def get_datadir():
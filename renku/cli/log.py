@@ -52,6 +52,8 @@ Following formats supported when specified with ``--format`` option:
 
 * `ascii`
 * `dot`
+* `json-ld-stream`
+* `nq`
 
 You can generate a PNG of the full history of all files in the repository
 using the :program:`dot` program.
@@ -62,6 +64,17 @@ using the :program:`dot` program.
    $ renku log --format dot $FILES | dot -Tpng > /tmp/graph.png
    $ open /tmp/graph.png
 
+The ``json-ld-stream`` and ``nq`` formats write one activity at a time
+without processing the whole graph in memory, hence they are suitable for
+piping the provenance of large projects to other tools. Each line of
+``json-ld-stream`` is an expanded JSON-LD node and the ``nq`` output is
+also valid N-Triples and Turtle since all statements are in the default
+graph.
+
+.. code-block:: console
+
+   $ renku log --format nq $FILES | gzip > /tmp/graph.nq.gz
+
 """
 
 import click
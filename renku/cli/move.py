@@ -74,30 +74,37 @@ def move(ctx, client, sources, destination):
             click.edit(filename=str(client.path / '.gitignore'))
 
     # 2. Update dataset metadata files.
+    renamed = {}
+    for path, dataset_files in client.dataset_files.items():
+        renames = {}
+
+        for file in dataset_files:
+            filepath = fmt_path(os.path.normpath(str(path.parent / file)))
+
+            if filepath in files:
+                renames[file] = os.path.relpath(
+                    destinations[filepath], start=str(path.parent)
+                )
+
+        if renames:
+            renamed[path] = renames
+
+    # Only datasets with moved files are loaded.
     with progressbar(
-        client.datasets.items(),
+        ((path, client.load_dataset(path), renames)
+         for path, renames in renamed.items()),
+        length=len(renamed),
         item_show_func=lambda item: str(item[1].short_id) if item else '',
         label='Updating dataset metadata',
         width=0,
     ) as bar:
-        for (path, dataset) in bar:
-            renames = {}
-
-            for file in dataset.files:
-                filepath = fmt_path(os.path.normpath(str(path.parent / file)))
-
-                if filepath in files:
-                    renames[file] = os.path.relpath(
-                        destinations[filepath], start=str(path.parent)
-                    )
-
-            if renames:
-                dataset = dataset.rename_files(
-                    lambda key: renames.get(key, key)
-                )
+        for (path, dataset, renames) in bar:
+            dataset = dataset.rename_files(
+                lambda key: renames.get(str(key), key)
+            )
 
-                with path.open('w') as fp:
-                    yaml.dump(asjsonld(dataset), fp, default_flow_style=False)
+            with path.open('w') as fp:
+                yaml.dump(asjsonld(dataset), fp, default_flow_style=False)
 
     # 3. Manage .gitattributes for external storage.
     tracked = tuple(
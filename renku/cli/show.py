@@ -67,8 +67,13 @@ respectively.
 
 """
 
+import itertools
+import os
+
 import click
 
+from renku._compat import Path
+
 from ._client import pass_local_client
 from ._graph import Graph
 
@@ -158,23 +163,40 @@ def outputs(ctx, client, revision, paths):
 
     <PATHS>    Files to show. If no files are given all output files are shown.
     """
+    from ._cache import OutputsCache
+
     graph = Graph(client)
-    filter = graph.build(paths=paths, revision=revision)
-    output_paths = graph.output_paths
+    outputs = OutputsCache(client).outputs(revision=revision, jobs=graph.jobs)
+
+    if not paths:
+        output_paths = set(outputs)
+    else:
+        output_paths = set()
+        missing = False
+
+        for path in paths:
+            path = graph.normalize_path(path)
+            # Files in generated directories are shown as the directory.
+            generated = [
+                str(parent)
+                for parent in itertools.chain([Path(path)],
+                                              Path(path).parents)
+                if str(parent) in outputs
+            ]
+            if not generated and os.path.isdir(str(client.path / path)):
+                prefix = path.rstrip('/') + '/'
+                generated = [
+                    output for output in outputs
+                    if path == '.' or output.startswith(prefix)
+                ]
+
+            output_paths.update(generated)
+            missing = missing or not generated
 
     click.echo('\n'.join(graph._format_path(path) for path in output_paths))
 
-    if paths:
-        if not output_paths:
-            ctx.exit(1)
-
-        from renku.models._datastructures import DirectoryTree
-        tree = DirectoryTree.from_list(item.path for item in filter)
-
-        for output in output_paths:
-            if tree.get(output) is None:
-                ctx.exit(1)
-                return
+    if paths and missing:
+        ctx.exit(1)
 
 
 def _context_names():
@@ -26,6 +26,13 @@ and paths of files that have been used in diverent versions.
 The first paths are what need to be recreated by running ``renku update``.
 See more in section about :ref:`renku update <cli-update>`.
 
+You can limit the status to given files. Only their lineage is inspected,
+which is much faster in large repositories:
+
+.. code-block:: console
+
+   $ renku status data/result.txt
+
 The paths mentioned in the output are made relative to the current directory
 if you are working in a subdirectory (this is on purpose, to help
 cutting and pasting to other commands). They also contain first 8 characters
@@ -59,8 +66,9 @@ from ._graph import Graph
 def status(ctx, client, revision, no_output, path):
     """Show a status of the repository."""
     graph = Graph(client)
-    # TODO filter only paths = {graph.normalize_path(p) for p in path}
-    status = graph.build_status(revision=revision, can_be_cwl=no_output)
+    status = graph.build_status(
+        revision=revision, can_be_cwl=no_output, paths=path
+    )
 
     click.echo('On branch {0}'.format(client.repo.active_branch))
     if status['outdated']:
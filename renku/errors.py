@@ -18,9 +18,9 @@
 """Renku exceptions."""
 
 import os
+import sys
 
 import click
-import requests
 
 
 class RenkuException(Exception):
@@ -31,45 +31,6 @@ class RenkuException(Exception):
     """
 
 
-class APIError(requests.exceptions.HTTPError, RenkuException):
-    """Catch HTTP errors from API calls."""
-
-    @classmethod
-    def from_http_exception(cls, e):
-        """Create ``APIError`` from ``requests.exception.HTTPError``."""
-        assert isinstance(e, requests.exceptions.HTTPError)
-        response = e.response
-        try:
-            message = response.json()['message']
-        except (KeyError, ValueError):
-            message = response.content.strip()
-
-        raise cls(message)
-
-
-class UnexpectedStatusCode(APIError):
-    """Raise when the status code does not match specification."""
-
-    def __init__(self, response):
-        """Build custom message."""
-        super(UnexpectedStatusCode, self).__init__(
-            'Unexpected status code: {0}'.format(response.status_code),
-            response=response
-        )
-
-    @classmethod
-    def return_or_raise(cls, response, expected_status_code):
-        """Check for ``expected_status_code``."""
-        try:
-            if response.status_code in expected_status_code:
-                return response
-        except TypeError:
-            if response.status_code == expected_status_code:
-                return response
-
-        raise cls(response)
-
-
 class InvalidFileOperation(RenkuException):
     """Raise when trying to perfrom invalid file operation."""
 
@@ -226,10 +187,6 @@ class InvalidSuccessCode(RenkuException, click.ClickException):
         super(InvalidSuccessCode, self).__init__(msg)
 
 
-class NotFound(APIError):
-    """Raise when an API object is not found."""
-
-
 class ExternalStorageNotInstalled(RenkuException, click.ClickException):
     """Raise when LFS is required but not found or installed in the repo."""
 
@@ -258,3 +215,36 @@ class UninitializedProject(RenkuException, click.ClickException):
             'Initialize it with "renku init"'.format(repo_path=repo_path)
         )
         super(UninitializedProject, self).__init__(msg)
+
+
+class CyclicDependency(RenkuException, ValueError):
+    """Raise when nodes can not be sorted due to a cycle."""
+
+    def __init__(self, nodes):
+        """Build a custom message."""
+        self.nodes = nodes
+        super(CyclicDependency, self).__init__(
+            'Cyclic dependency between: {0}'.format(
+                ', '.join(str(node) for node in nodes)
+            )
+        )
+
+
+class DownloadError(RenkuException, click.ClickException):
+    """Raise when a file can not be downloaded completely."""
+
+
+def __getattr__(name):
+    """Import errors of HTTP requests only when they are used."""
+    if name in {'APIError', 'NotFound', 'UnexpectedStatusCode'}:
+        from renku import _http_errors
+        return getattr(_http_errors, name)
+    raise AttributeError(
+        'module {0!r} has no attribute {1!r}'.format(__name__, name)
+    )
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # Module attributes can not be loaded lazily.
+    from renku._http_errors import APIError, NotFound, \
+        UnexpectedStatusCode  # noqa
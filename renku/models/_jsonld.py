@@ -20,19 +20,22 @@
 import json
 import os
 import weakref
+from collections import OrderedDict
 from copy import deepcopy
 
 import attr
 from attr._compat import iteritems
 from attr._funcs import has
 from attr._make import Factory, fields
-from pyld import jsonld as ld
 
 from renku._compat import Path
 
 KEY = '__json_ld'
 KEY_CLS = '__json_ld_cls'
 
+COMPILED_CONTEXTS_SIZE = 128
+"""Number of compiled context pairs kept in memory."""
+
 DOC_TPL = (
     "{cls.__doc__}\n\n"
     "**Type:**\n\n"
@@ -45,6 +48,9 @@ DOC_TPL = (
 
 make_type = type
 
+_UNREGISTERED = []
+"""Classes waiting for registration of their expanded JSON-LD types."""
+
 
 def attrs(
     maybe_cls=None, type=None, context=None, translate=None, **attrs_kwargs
@@ -124,26 +130,8 @@ def attrs(
             context=context_doc,
         )
 
-        # Register class for given JSON-LD @type
-        try:
-            type_ = ld.expand({
-                '@type': jsonld_cls._jsonld_type,
-                '@context': context
-            })[0]['@type']
-            if isinstance(type_, list):
-                type_ = tuple(sorted(type_))
-        except Exception:
-            # FIXME make sure all classes have @id defined
-            return jsonld_cls
-
-        if type_ in jsonld_cls.__type_registry__:
-            raise TypeError(
-                'Type {0!r} is already registered for class {1!r}.'.format(
-                    jsonld_cls._jsonld_type,
-                    jsonld_cls.__type_registry__[jsonld_cls._jsonld_type],
-                )
-            )
-        jsonld_cls.__type_registry__[type_] = jsonld_cls
+        # Register class for given JSON-LD @type when it is looked up.
+        _UNREGISTERED.append(jsonld_cls)
         return jsonld_cls
 
     if maybe_cls is None:
@@ -151,6 +139,42 @@ def attrs(
     return wrap(maybe_cls)
 
 
+def _register(jsonld_cls):
+    """Register the class for its expanded JSON-LD type."""
+    from pyld import jsonld as ld
+
+    try:
+        type_ = ld.expand({
+            '@type': jsonld_cls._jsonld_type,
+            '@context': jsonld_cls._jsonld_context,
+        })[0]['@type']
+        if isinstance(type_, list):
+            type_ = tuple(sorted(type_))
+    except Exception:
+        # FIXME make sure all classes have @id defined
+        return
+
+    if type_ in jsonld_cls.__type_registry__:
+        raise TypeError(
+            'Type {0!r} is already registered for class {1!r}.'.format(
+                jsonld_cls._jsonld_type,
+                jsonld_cls.__type_registry__[jsonld_cls._jsonld_type],
+            )
+        )
+    jsonld_cls.__type_registry__[type_] = jsonld_cls
+
+
+def type_registry():
+    """Return classes registered for JSON-LD types.
+
+    Types are expanded on the first lookup instead of when the classes are
+    defined, since importing the JSON-LD processor is slow.
+    """
+    while _UNREGISTERED:
+        _register(_UNREGISTERED.pop(0))
+    return JSONLDMixin.__type_registry__
+
+
 def attrib(context=None, **kwargs):
     """Create a new attribute with context."""
     kwargs.setdefault('metadata', {})
@@ -204,6 +228,42 @@ container = type(
 )
 
 
+_jsonld_attrs = {}
+"""Cache of attributes serialized for each class."""
+
+_contained_contexts = {}
+"""Cache of class contexts fully defined by contexts of other classes."""
+
+
+def _attrs(cls):
+    """Return attributes of the class serialized to JSON-LD."""
+    if cls not in _jsonld_attrs:
+        _jsonld_attrs[cls] = tuple(
+            field for field in fields(cls) if field.name in cls._jsonld_fields
+        )
+    return _jsonld_attrs[cls]
+
+
+def _is_contained(scope, cls):
+    """Check if the context of the class is defined by the scope class."""
+    key = (scope, cls)
+    if key not in _contained_contexts:
+        context = scope._jsonld_context
+        _contained_contexts[key] = all(
+            term in context and context[term] == definition
+            for term, definition in cls._jsonld_context.items()
+        )
+    return _contained_contexts[key]
+
+
+def _copy_context(context):
+    """Copy the context and its term definitions."""
+    return {
+        term: dict(definition) if isinstance(definition, dict) else definition
+        for term, definition in context.items()
+    }
+
+
 def asjsonld(
     inst,
     recurse=True,
@@ -212,13 +272,20 @@ def asjsonld(
     retain_collection_types=False,
     export_context=True,
     basedir=None,
+    scope=None,
 ):
-    """Dump a JSON-LD class to the JSON with generated ``@context`` field."""
-    jsonld_fields = inst.__class__._jsonld_fields
-    attrs = tuple(
-        field
-        for field in fields(inst.__class__) if field.name in jsonld_fields
-    )
+    """Dump a JSON-LD class to the JSON with generated ``@context`` field.
+
+    Nested objects do not export their context when it is fully defined by
+    the context of the ``scope`` class, which is exported by the enclosing
+    object.
+    """
+    inst_cls = type(inst)
+    if scope is not None and export_context:
+        export_context = not _is_contained(scope, inst_cls)
+    if export_context:
+        scope = inst_cls
+
     rv = dict_factory()
 
     def convert_value(v):
@@ -228,7 +295,7 @@ def asjsonld(
             return os.path.relpath(v, str(basedir)) if basedir else v
         return v
 
-    for a in attrs:
+    for a in _attrs(inst_cls):
         v = getattr(inst, a.name)
 
         # skip proxies
@@ -248,6 +315,7 @@ def asjsonld(
                     filter=filter,
                     dict_factory=dict_factory,
                     basedir=basedir,
+                    scope=scope,
                 )
             elif isinstance(v, (tuple, list, set)):
                 cf = v.__class__ if retain_collection_types is True else list
@@ -259,6 +327,7 @@ def asjsonld(
                         dict_factory=dict_factory,
                         export_context=ec,
                         basedir=basedir,
+                        scope=scope,
                     ) if has(i.__class__) else i for i in v
                 ])
             elif isinstance(v, dict):
@@ -274,6 +343,7 @@ def asjsonld(
                         dict_factory=df,
                         export_context=ec,
                         basedir=basedir,
+                        scope=scope,
                     ) if has(vv.__class__) else vv
                 ) for kk, vv in iteritems(v))
             else:
@@ -281,16 +351,200 @@ def asjsonld(
         else:
             rv[a.name] = convert_value(v)
 
-    inst_cls = type(inst)
-
     if export_context:
-        rv['@context'] = deepcopy(inst_cls._jsonld_context)
+        rv['@context'] = _copy_context(inst_cls._jsonld_context)
 
     if inst_cls._jsonld_type:
         rv['@type'] = inst_cls._jsonld_type
     return rv
 
 
+class _UnsupportedContext(Exception):
+    """Raise when data must be compacted by the JSON-LD processor."""
+
+
+def _expand_iri(context, value, vocab=True):
+    """Expand a term or a compact IRI using a flat context."""
+    if vocab and value in context:
+        definition = context[value]
+        if isinstance(definition, dict):
+            definition = definition.get('@id')
+        if not isinstance(definition, str) or definition == value:
+            return definition if definition and ':' in definition else None
+        return _expand_iri(context, definition, vocab=False)
+
+    if ':' in value:
+        prefix, suffix = value.split(':', 1)
+        if prefix == '_' or suffix.startswith('//') or prefix not in context:
+            return value
+        base = _expand_iri(context, prefix)
+        return base + suffix if base else None
+
+    return None if vocab else value
+
+
+@attr.s
+class _CompiledContext(object):
+    """Translate keys of JSON-LD documents between two flat contexts.
+
+    Terms with the same definition in both contexts are kept and other
+    terms are mapped through their expanded IRIs, which is much faster than
+    expanding and compacting the whole document.
+    """
+
+    source = attr.ib()
+    target = attr.ib()
+
+    _keys = attr.ib(default=attr.Factory(dict), init=False)
+
+    def __attrs_post_init__(self):
+        """Check that both contexts contain only simple term definitions."""
+        for context in (self.source, self.target):
+            if not isinstance(context, dict):
+                raise _UnsupportedContext(context)
+
+            for term, definition in context.items():
+                if term.startswith('@'):
+                    raise _UnsupportedContext(term)
+                if isinstance(definition, dict) and not set(definition) <= {
+                    '@id', '@type', '@container'
+                }:
+                    raise _UnsupportedContext(term)
+                if not isinstance(definition, (str, dict)):
+                    raise _UnsupportedContext(term)
+
+    def _definition(self, context, term):
+        """Return the type coercion and container of the term."""
+        definition = context.get(term)
+        if not isinstance(definition, dict):
+            return None, None
+
+        type_ = definition.get('@type')
+        if type_ not in (None, '@id', '@vocab'):
+            type_ = _expand_iri(context, type_)
+        return type_, definition.get('@container')
+
+    def key(self, key):
+        """Return the target term of the key or ``None`` to drop it."""
+        if key in self._keys:
+            return self._keys[key]
+
+        source, target = self.source, self.target
+        if source.get(key) == target.get(key) and ':' not in key:
+            term = key
+        else:
+            iri = _expand_iri(source, key)
+            terms = [
+                term for term in target
+                if iri is not None and _expand_iri(target, term) == iri
+            ]
+            if len(terms) > 1 or (
+                terms and self._definition(source, key) !=
+                self._definition(target, terms[0])
+            ):
+                raise _UnsupportedContext(key)
+            term = terms[0] if terms else None
+
+        self._keys[key] = term
+        return term
+
+    def _iri(self, value, vocab):
+        """Check that the IRI has the same meaning in both contexts."""
+        if isinstance(value, str) and _expand_iri(
+            self.source, value, vocab=vocab
+        ) != _expand_iri(self.target, value, vocab=vocab):
+            raise _UnsupportedContext(value)
+        return value
+
+    def _value(self, term, value):
+        """Translate nested nodes of the value."""
+        if isinstance(value, list):
+            return [self._value(term, item) for item in value]
+
+        type_, container = self._definition(self.target, term)
+        if isinstance(value, dict):
+            if container == '@index':
+                return {
+                    index: self._value(None, item)
+                    for index, item in value.items()
+                }
+            return self.node(value)
+
+        if type_ in ('@id', '@vocab') and value is not None:
+            return self._iri(value, vocab=type_ == '@vocab')
+        return value
+
+    def node(self, data):
+        """Translate keys of the node and its nested nodes."""
+        result = {}
+        for key, value in data.items():
+            if key == '@type':
+                if isinstance(value, list):
+                    result[key] = [self._iri(item, True) for item in value]
+                else:
+                    result[key] = self._iri(value, True)
+            elif key == '@id':
+                result[key] = self._iri(value, False)
+            elif key.startswith('@'):
+                raise _UnsupportedContext(key)
+            else:
+                term = self.key(key)
+                if term is None:
+                    continue
+                if term in result:
+                    raise _UnsupportedContext(key)
+                result[term] = self._value(term, value)
+        return result
+
+
+_compiled_contexts = OrderedDict()
+
+
+def _compiled_context(source, target):
+    """Return a cached compiled context or ``None`` if not supported."""
+    fingerprint = (
+        json.dumps(source, sort_keys=True),
+        json.dumps(target, sort_keys=True),
+    )
+    if fingerprint in _compiled_contexts:
+        _compiled_contexts.move_to_end(fingerprint)
+        return _compiled_contexts[fingerprint]
+
+    try:
+        compiled = _CompiledContext(deepcopy(source), deepcopy(target))
+    except _UnsupportedContext:
+        compiled = None
+
+    _compiled_contexts[fingerprint] = compiled
+    while len(_compiled_contexts) > COMPILED_CONTEXTS_SIZE:
+        _compiled_contexts.popitem(last=False)
+    return compiled
+
+
+def compact(data, context):
+    """Compact the JSON-LD document using the given context.
+
+    Keys are translated directly when both contexts are flat dictionaries,
+    otherwise the document is compacted by the JSON-LD processor.
+    """
+    compiled = _compiled_context(data.get('@context', {}), context)
+    if compiled is not None:
+        try:
+            compacted = compiled.node(
+                {k: v
+                 for k, v in data.items() if k != '@context'}
+            )
+        except _UnsupportedContext:
+            pass
+        else:
+            compacted['@context'] = context
+            return compacted
+
+    from pyld import jsonld as ld
+
+    return ld.compact(data, {'@context': context})
+
+
 class JSONLDMixin(object):
     """Mixin for loading a JSON-LD data."""
 
@@ -307,21 +561,22 @@ class JSONLDMixin(object):
 
         if '@type' in data:
             type_ = tuple(sorted(data['@type']))
-            if type_ in cls.__type_registry__ and getattr(
+            registry = type_registry()
+            if type_ in registry and getattr(
                 cls, '_jsonld_type', None
             ) != type_:
-                new_cls = cls.__type_registry__[type_]
+                new_cls = registry[type_]
                 if cls != new_cls:
                     return new_cls.from_jsonld(data)
 
         if cls._jsonld_translate:
-            data = ld.compact(data, {'@context': cls._jsonld_translate})
+            data = compact(data, cls._jsonld_translate)
             data.pop('@context', None)
 
         data.setdefault('@context', cls._jsonld_context)
 
         if data['@context'] != cls._jsonld_context:
-            compacted = ld.compact(data, {'@context': cls._jsonld_context})
+            compacted = compact(data, cls._jsonld_context)
         else:
             compacted = data
 
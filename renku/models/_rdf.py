@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Expand JSON-LD documents and serialize them as N-Quads.
+
+Only the subset of JSON-LD generated by :func:`renku.models._jsonld.asjsonld`
+is supported: embedded contexts with prefixes, term definitions with
+``@id``, ``@type``, ``@reverse`` and ``@container`` and node objects.
+Processed contexts are cached, hence documents with the same contexts are
+expanded without repeating the context processing.
+"""
+
+import json
+import re
+from urllib.parse import urljoin
+
+import attr
+
+RDF_TYPE = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#type'
+RDF_FIRST = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#first'
+RDF_REST = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#rest'
+RDF_NIL = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#nil'
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+BASE = 'file:///'
+"""Base used to resolve relative IRIs in N-Quads."""
+
+_ABSOLUTE_IRI = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+_NQUADS_ESCAPE = str.maketrans({
+    '\\': '\\\\',
+    '"': '\\"',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+@attr.s(slots=True, frozen=True)
+class Term(object):
+    """Processed term definition."""
+
+    iri = attr.ib()
+    type = attr.ib(default=None)
+    reverse = attr.ib(default=False)
+    container = attr.ib(default=None)
+
+
+@attr.s(slots=True)
+class Context(object):
+    """Processed active context."""
+
+    terms = attr.ib(default=attr.Factory(dict))
+    base = attr.ib(default=None)
+    """Base used to resolve relative IRIs (they are kept if not set)."""
+
+    _children = attr.ib(default=attr.Factory(dict))
+
+    def expand_iri(self, value, vocab=True):
+        """Expand a term, compact IRI or a relative IRI."""
+        if value.startswith('@'):
+            return value
+
+        if vocab and value in self.terms:
+            return self.terms[value].iri
+
+        prefix, colon, suffix = value.partition(':')
+        if colon:
+            if prefix == '_' or suffix.startswith('//'):
+                return value
+            if prefix in self.terms:
+                return self.terms[prefix].iri + suffix
+            return value
+
+        if vocab:
+            return None
+        return urljoin(self.base, value) if self.base else value
+
+    def merge(self, context):
+        """Return an active context updated with the local context."""
+        key = json.dumps(context, sort_keys=True)
+        if key in self._children:
+            return self._children[key]
+
+        result = Context(terms=dict(self.terms), base=self.base)
+        # Prefixes are defined first since terms can use them.
+        items = sorted(
+            context.items(), key=lambda item: not isinstance(item[1], str)
+        )
+        for term, definition in items:
+            if definition is None:
+                result.terms.pop(term, None)
+                continue
+
+            if isinstance(definition, str):
+                definition = {'@id': definition}
+
+            reverse = '@reverse' in definition
+            iri = definition.get('@reverse', definition.get('@id', term))
+            type_ = definition.get('@type')
+            result.terms[term] = Term(
+                iri=result.expand_iri(iri) or iri,
+                type=result.expand_iri(type_) if type_ else None,
+                reverse=reverse,
+                container=definition.get('@container'),
+            )
+
+        self._children[key] = result
+        return result
+
+
+_ROOTS = {}
+"""Initial contexts keyed by their base."""
+
+
+def _as_list(value):
+    """Return value as a list."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _expand_value(context, term, value):
+    """Expand a scalar value."""
+    if term is not None and term.type == '@id' and isinstance(value, str):
+        return {'@id': context.expand_iri(value, vocab=False)}
+
+    result = {'@value': value}
+    if term is not None and term.type and not term.type.startswith('@'):
+        result['@type'] = term.type
+    return result
+
+
+def _expand_node(context, element):
+    """Expand a node object."""
+    if '@context' in element:
+        context = context.merge(element['@context'])
+
+    result = {}
+    for key in sorted(element):
+        if key == '@context':
+            continue
+
+        value = element[key]
+        prop = context.expand_iri(key)
+        if prop is None or (':' not in prop and not prop.startswith('@')):
+            continue
+
+        if prop == '@id':
+            result['@id'] = context.expand_iri(value, vocab=False)
+            continue
+        elif prop == '@type':
+            result['@type'] = [context.expand_iri(t) for t in _as_list(value)]
+            continue
+        elif prop.startswith('@'):
+            result[prop] = value
+            continue
+
+        term = context.terms.get(key)
+        if term is not None and term.container == '@index' and \
+                isinstance(value, dict):
+            expanded = []
+            for index in sorted(value):
+                for item in _as_list(_expand(context, term, value[index])):
+                    if isinstance(item, dict):
+                        item.setdefault('@index', index)
+                    expanded.append(item)
+        else:
+            expanded = _expand(context, term, value)
+            if expanded is None:
+                continue
+
+        expanded = _as_list(expanded)
+        if term is not None and term.container == '@list':
+            expanded = [{'@list': expanded}]
+
+        if term is not None and term.reverse:
+            reverse = result.setdefault('@reverse', {})
+            reverse.setdefault(prop, []).extend(expanded)
+        else:
+            result.setdefault(prop, []).extend(expanded)
+
+    return result
+
+
+def _expand(context, term, element):
+    """Expand an element using the active context."""
+    if element is None:
+        return None
+    elif isinstance(element, list):
+        result = []
+        for item in element:
+            expanded = _expand(context, term, item)
+            if expanded is not None:
+                result.extend(_as_list(expanded))
+        return result
+    elif isinstance(element, dict):
+        return _expand_node(context, element)
+    return _expand_value(context, term, element)
+
+
+def expand(document, base=None):
+    """Return a list of expanded node objects from the document.
+
+    Relative IRIs are resolved against the ``base`` if it is given.
+    """
+    context = _ROOTS.setdefault(base, Context(base=base))
+    result = _expand(context, None, document)
+    return [node for node in _as_list(result) if node]
+
+
+def resolve(iri):
+    """Resolve a relative IRI against the base."""
+    if iri.startswith('_:') or _ABSOLUTE_IRI.match(iri):
+        return iri
+    return urljoin(BASE, iri)
+
+
+def literal(value):
+    """Return a lexical form and a datatype of the value object."""
+    data = value['@value']
+    datatype = value.get('@type')
+
+    if isinstance(data, bool):
+        data = 'true' if data else 'false'
+        datatype = datatype or XSD + 'boolean'
+    elif isinstance(data, int):
+        data = str(data)
+        datatype = datatype or XSD + 'integer'
+    elif isinstance(data, float):
+        data = '{0:1.15E}'.format(data)
+        datatype = datatype or XSD + 'double'
+
+    if datatype == XSD + 'string':
+        datatype = None
+    return str(data), datatype
+
+
+def _format_term(term):
+    """Format an IRI, a blank node or a value object for N-Quads."""
+    if isinstance(term, dict):
+        data, datatype = literal(term)
+        result = '"{0}"'.format(data.translate(_NQUADS_ESCAPE))
+        if datatype:
+            result += '^^' + _format_term(resolve(datatype))
+        return result
+    elif term.startswith('_:'):
+        return term
+    return '<{0}>'.format(term)
+
+
+@attr.s
+class NQuadsWriter(object):
+    """Serialize expanded node objects as triples or N-Quads.
+
+    Subjects and predicates of triples are absolute IRIs or blank node
+    identifiers and objects can also be value objects.
+    """
+
+    _blank_nodes = attr.ib(default=0, init=False)
+
+    def _blank_node(self):
+        """Return a new blank node identifier."""
+        self._blank_nodes += 1
+        return '_:b{0}'.format(self._blank_nodes)
+
+    def _object(self, value, triples):
+        """Return an object term and collect its triples."""
+        if '@value' in value:
+            return value
+        elif '@list' in value:
+            head = RDF_NIL
+            for item in reversed(value['@list']):
+                node = self._blank_node()
+                triples.append((node, RDF_FIRST, self._object(item, triples)))
+                triples.append((node, RDF_REST, head))
+                head = node
+            return head
+        return self._node(value, triples)
+
+    def _node(self, node, triples):
+        """Collect triples of the node and return its identifier."""
+        subject = resolve(node['@id']) if '@id' in node else \
+            self._blank_node()
+
+        for type_ in node.get('@type', []):
+            triples.append((subject, RDF_TYPE, resolve(type_)))
+
+        for prop, values in node.items():
+            if prop == '@reverse':
+                for reverse_prop, reverse_values in values.items():
+                    for value in reverse_values:
+                        triples.append((
+                            self._node(value, triples),
+                            resolve(reverse_prop),
+                            subject,
+                        ))
+            elif not prop.startswith('@'):
+                for value in values:
+                    triples.append((
+                        subject,
+                        resolve(prop),
+                        self._object(value, triples),
+                    ))
+
+        return subject
+
+    def triples(self, node):
+        """Return triples of the node."""
+        triples = []
+        self._node(node, triples)
+        return triples
+
+    def lines(self, node):
+        """Yield unique N-Quads lines of the node."""
+        seen = set()
+        for triple in self.triples(node):
+            line = ' '.join(_format_term(term) for term in triple) + ' .'
+            if line not in seen:
+                seen.add(line)
+                yield line
@@ -17,30 +17,85 @@
 # limitations under the License.
 """Process Git repository."""
 
-from collections import deque
+import heapq
+from collections import defaultdict
 
-GRAY, BLACK = 0, 1
+from renku.errors import CyclicDependency
 
 
-def topological(nodes):
-    """Return nodes in a topological order."""
-    order, enter, state = deque(), set(nodes), {}
+def topological(nodes, key=None):
+    """Return nodes in a topological order.
 
-    def dfs(node):
-        """Visit nodes in depth-first order."""
-        state[node] = GRAY
-        for parent in nodes.get(node, ()):
-            color = state.get(parent, None)
-            if color == GRAY:
-                raise ValueError('cycle')
-            if color == BLACK:
-                continue
-            enter.discard(parent)
-            dfs(parent)
-        order.appendleft(node)
-        state[node] = BLACK
+    Every node is listed before its parents. Nodes ready at the same time
+    are sorted by the ``key`` function and by their first appearance in
+    ``nodes``, hence the order does not depend on hashing.
 
-    while enter:
-        dfs(enter.pop())
+    :param nodes: Mapping from a node to an iterable of its parents.
+    :param key: Function returning a sort key of a node.
+    :raises renku.errors.CyclicDependency: if nodes form a cycle.
+    """
+    positions = {}
+    parents = defaultdict(list)
+    children = defaultdict(int)
+
+    for node, node_parents in nodes.items():
+        positions.setdefault(node, len(positions))
+        for parent in node_parents:
+            positions.setdefault(parent, len(positions))
+            parents[node].append(parent)
+            children[parent] += 1
+
+    def _item(node):
+        """Return a heap item for the node."""
+        position = positions[node]
+        if key is None:
+            return position, position
+        return key(node), position
+
+    order_by = {position: node for node, position in positions.items()}
+    ready = [_item(node) for node in positions if not children[node]]
+    heapq.heapify(ready)
+
+    order = []
+    while ready:
+        _, position = heapq.heappop(ready)
+        node = order_by[position]
+        order.append(node)
+
+        for parent in parents[node]:
+            children[parent] -= 1
+            if not children[parent]:
+                heapq.heappush(ready, _item(parent))
+
+    if len(order) < len(positions):
+        raise CyclicDependency(_find_cycle_nodes(parents, children))
 
     return order
+
+
+def _find_cycle_nodes(parents, children):
+    """Return nodes on cycles from nodes that were not sorted."""
+    # Unsorted nodes are on cycles or they are ancestors of cycles.
+    remaining = {node for node, count in children.items() if count}
+
+    # Remove ancestors starting from nodes without unsorted parents.
+    outgoing = {
+        node: sum(1 for parent in parents[node] if parent in remaining)
+        for node in remaining
+    }
+    incoming = defaultdict(list)
+    for node in remaining:
+        for parent in parents[node]:
+            if parent in remaining:
+                incoming[parent].append(node)
+
+    queue = [node for node, count in outgoing.items() if not count]
+    while queue:
+        node = queue.pop()
+        remaining.discard(node)
+        for child in incoming[node]:
+            outgoing[child] -= 1
+            if not outgoing[child]:
+                queue.append(child)
+
+    return sorted(remaining, key=str)
@@ -198,3 +198,41 @@ class Dataset(object):
             files[key] = attr.evolve(file, path=key)
 
         return attr.evolve(self, files=files)
+
+
+@attr.s(frozen=True)
+class DatasetSummary(object):
+    """Summarize a dataset without its list of files."""
+
+    identifier = attr.ib(converter=lambda x: uuid.UUID(str(x)))
+    name = attr.ib()
+    created = attr.ib(converter=_parse_date)
+    authors = attr.ib(
+        converter=lambda authors: [
+            author if isinstance(author, Author) else Author(**author)
+            for author in authors
+        ],
+    )
+    files = attr.ib(default=0)
+    """Number of files in the dataset."""
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """Summarize the dataset."""
+        return cls(
+            identifier=dataset.identifier,
+            name=dataset.name,
+            created=dataset.created,
+            authors=dataset.authors,
+            files=len(dataset.files),
+        )
+
+    @property
+    def short_id(self):
+        """Shorter version of identifier."""
+        return str(self.identifier)[:8]
+
+    @property
+    def authors_csv(self):
+        """Comma-separated list of authors associated with dataset."""
+        return ",".join(author.name for author in self.authors)
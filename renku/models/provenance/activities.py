@@ -168,6 +168,9 @@ class Activity(CommitMixin):
     @property
     def paths(self):
         """Return all paths in the commit."""
+        if len(self.commit.parents) < 2:
+            return set(self.client.git_reader.changes(self.commit))
+
         return {
             item.a_path
             for item in self.commit.diff(self.commit.parents or NULL_TREE)
@@ -418,8 +421,9 @@ class WorkflowRun(ProcessRun):
                 return step.run
 
             if self.commit:
-                data = (self.commit.tree / basedir /
-                        step.run).data_stream.read()
+                data = self.client.git_reader.read(
+                    self.commit, os.path.join(basedir, step.run)
+                )
             else:
                 with step.run.open('r') as f:
                     data = f.read()
@@ -577,23 +581,32 @@ class WorkflowRun(ProcessRun):
             yield from subprocess.nodes
 
 
+def find_process_path(commit, client):
+    """Return a path of the process (CWL file) added in the given commit."""
+    path = None
+
+    for file_ in client.git_reader.changes(commit):
+        # 1.a Find process (CommandLineTool or Workflow);
+        if client.is_cwl(file_):
+            if path is not None:
+                # This is a regular activity since it edits two CWL files
+                return None
+
+            path = file_
+
+    return path
+
+
 def from_git_commit(commit, client, path=None):
     """Populate information from the given Git commit."""
     if len(commit.parents) > 1:
         return Activity(commit=commit, client=client)
 
     if path is None:
-        for file_ in commit.stats.files.keys():
-            # 1.a Find process (CommandLineTool or Workflow);
-            if client.is_cwl(file_):
-                if path is not None:
-                    # This is a regular activity since it edits two CWL files
-                    return Activity(commit=commit, client=client)
-
-                path = file_
+        path = find_process_path(commit, client)
 
     if path:
-        data = (commit.tree / path).data_stream.read()
+        data = client.git_reader.read(commit, path)
         process = CWLClass.from_cwl(yaml.load(data))
 
         return process.create_run(
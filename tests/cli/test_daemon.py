@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test ``daemon`` command."""
+
+import threading
+from contextlib import contextmanager
+
+from renku import cli
+from renku.cli import _cache, _daemon, _echo
+
+
+@contextmanager
+def _serve(client):
+    """Serve requests for the client in a thread."""
+    options = _daemon.client_options(client.path, '.renku', False)
+    path = _daemon.socket_path(client.path, '.renku')
+    daemon = _daemon.Daemon(cli=cli.cli, options=options)
+    server = _daemon.Server(path, daemon)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    try:
+        yield daemon, path
+    finally:
+        daemon.stopped = True
+        thread.join()
+        server.server_close()
+
+
+def test_daemon_answers_commands(runner, client, run):
+    """Commands are answered by the running daemon."""
+    assert 0 == run(args=('-S', 'run', 'touch', 'output'))
+
+    options = _daemon.client_options(client.path, '.renku', False)
+    path = _daemon.socket_path(client.path, '.renku')
+    daemon = _daemon.Daemon(cli=cli.cli, options=options)
+    server = _daemon.Server(path, daemon)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+
+    try:
+        result = runner.invoke(cli.cli, ['-S', 'show', 'outputs'])
+        assert 0 == result.exit_code
+        assert 'output\n' == result.output
+        assert daemon._client is not None
+
+        # Usage errors are reported by the daemon.
+        result = runner.invoke(cli.cli, ['-S', 'show', 'outputs', 'unknown'])
+        assert 2 == result.exit_code
+
+        # The client is reused until references change.
+        warm = daemon._client
+        assert 0 == runner.invoke(cli.cli, ['-S', 'status']).exit_code
+        assert warm is daemon._client
+
+        assert 0 == run(args=('-S', 'run', 'touch', 'other'))
+        result = runner.invoke(cli.cli, ['-S', 'show', 'outputs'])
+        assert {'output', 'other'} == set(result.output.split())
+        assert warm is not daemon._client
+
+        result = runner.invoke(cli.cli, ['-S', 'daemon', 'stop'])
+        assert 0 == result.exit_code
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    finally:
+        daemon.stopped = True
+        thread.join()
+        server.server_close()
+
+    assert not path.exists()
+    result = runner.invoke(cli.cli, ['-S', 'daemon', 'stop'])
+    assert 1 == result.exit_code
+
+
+def test_daemon_pages_output(runner, client, run, monkeypatch):
+    """Output sent to the pager by the daemon is paged by the caller."""
+    assert 0 == run(args=('-S', 'run', 'touch', 'output'))
+
+    with _serve(client) as (daemon, path):
+        data = {
+            'cwd': str(client.path),
+            'options': daemon.options,
+        }
+        response = _daemon.request(path, dict(data, args=['log']))
+        assert 0 == response['exit_code']
+        assert response['pager']
+
+        response = _daemon.request(path, dict(data, args=['status']))
+        assert 0 == response['exit_code']
+        assert not response['pager']
+
+    monkeypatch.setattr(_daemon, 'request', lambda *args: response)
+    paged = []
+    monkeypatch.setattr(
+        _echo, 'echo_via_pager', lambda *args, **kwargs: paged.append(args)
+    )
+
+    response = dict(response, output='paged\n', pager=True)
+    result = runner.invoke(cli.cli, ['-S', 'log'])
+    assert 0 == result.exit_code
+    assert [('paged\n', )] == paged
+    assert '' == result.output
+
+    response = dict(response, output='printed\n', pager=False)
+    result = runner.invoke(cli.cli, ['-S', 'status'])
+    assert 0 == result.exit_code
+    assert 1 == len(paged)
+    assert 'printed\n' == result.output
+
+
+def test_daemon_keeps_activities(runner, client, run, monkeypatch):
+    """Activities are kept in memory between requests."""
+    assert 0 == run(args=('-S', 'run', 'touch', 'output'))
+    assert 0 == run(args=('-S', 'run', 'cp', 'output', 'copy'))
+
+    with _serve(client) as (daemon, _):
+        assert 0 == runner.invoke(cli.cli, ['-S', 'log']).exit_code
+        warm = daemon._client
+        assert _cache.ActivityCache(warm)._memory
+
+        loads = []
+        load = _cache.ActivityCache.load
+
+        def _load(self, commit):
+            loads.append(commit)
+            return load(self, commit)
+
+        monkeypatch.setattr(_cache.ActivityCache, 'load', _load)
+
+        assert 0 == runner.invoke(cli.cli, ['-S', 'log']).exit_code
+        assert warm is daemon._client
+        assert [] == loads
+
+    assert _cache.ActivityCache(warm)._memory is None
+
+
+def test_daemon_refuses_commands(client, run, tmpdir):
+    """Only read-only commands in the repository are answered."""
+    with _serve(client) as (daemon, path):
+        data = {
+            'cwd': str(client.path),
+            'options': daemon.options,
+        }
+        response = _daemon.request(
+            path, dict(data, args=['run', 'touch', 'output'])
+        )
+        assert response['exit_code'] is None
+        assert not (client.path / 'output').exists()
+
+        response = _daemon.request(
+            path, dict(data, args=['status'], cwd=str(tmpdir))
+        )
+        assert response['exit_code'] is None
+
+        response = _daemon.request(path, dict(data, args=['status']))
+        assert 0 == response['exit_code']
+
+
+def test_kept_activities_follow_working_tree(client, run):
+    """Kept activities are recreated when outputs become directories."""
+    assert 0 == run(args=('run', 'touch', 'output'))
+    commit = client.repo.head.commit
+
+    _cache.keep_activities(client)
+    try:
+        cache = _cache.ActivityCache(client)
+        activity = cache.from_git_commit(commit, client=client)
+        assert activity is cache.from_git_commit(commit, client=client)
+
+        (client.path / 'output').unlink()
+        (client.path / 'output').mkdir()
+        (client.path / 'output' / 'file').write_text('file')
+
+        recreated = cache.from_git_commit(commit, client=client)
+        assert recreated is not activity
+        assert 'output/file' in {
+            member.path
+            for generation in recreated.generated
+            for member in getattr(generation.entity, 'members', [])
+        }
+        assert recreated is not cache.from_git_commit(commit, client=client)
+    finally:
+        _cache.release_activities(client)
@@ -92,6 +92,25 @@ def test_datasets_list_non_empty(output_format, runner, project):
     assert 'dataset' in result.output
 
 
+def test_datasets_list_summaries(runner, project, monkeypatch):
+    """Test that listing of datasets does not load their metadata."""
+    from renku.api.datasets import DatasetsApiMixin
+
+    result = runner.invoke(cli.cli, ['dataset', 'create', 'dataset'])
+    assert result.exit_code == 0
+    result = runner.invoke(cli.cli, ['dataset'])
+    assert result.exit_code == 0
+
+    def _load_dataset(self, path):
+        raise AssertionError('Metadata of {0} was loaded.'.format(path))
+
+    monkeypatch.setattr(DatasetsApiMixin, 'load_dataset', _load_dataset)
+
+    result = runner.invoke(cli.cli, ['dataset'], catch_exceptions=False)
+    assert result.exit_code == 0
+    assert 'dataset' in result.output
+
+
 def test_multiple_file_to_dataset(
     tmpdir, data_repository, runner, project, client
 ):
@@ -117,6 +136,72 @@ def test_multiple_file_to_dataset(
     assert result.exit_code == 0
 
 
+def test_concurrent_add_to_dataset(tmpdir, runner, project, client):
+    """Test adding files and directories with several workers."""
+    result = runner.invoke(cli.cli, ['dataset', 'create', 'dataset'])
+    assert result.exit_code == 0
+
+    directory = tmpdir.mkdir('directory')
+    paths = [str(directory)]
+    for i in range(5):
+        directory.join('file_{0}'.format(i)).write(str(i))
+        new_file = tmpdir.join('single_{0}'.format(i))
+        new_file.write(str(i))
+        paths.append(str(new_file))
+
+    result = runner.invoke(
+        cli.cli,
+        ['dataset', 'add', 'dataset', '--jobs', '3'] + paths,
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+
+    with client.with_dataset('dataset') as dataset:
+        assert 10 == len(dataset.files)
+
+    data = client.path / client.datadir / 'dataset'
+    assert '4' == (data / 'directory' / 'file_4').read_text()
+    assert '4' == (data / 'single_4').read_text()
+
+
+def test_add_to_dataset_jobs(runner, project, client, monkeypatch):
+    """Test the default number of workers and reported errors."""
+    from renku.api import LocalClient
+
+    result = runner.invoke(cli.cli, ['dataset', 'create', 'dataset'])
+    assert 0 == result.exit_code
+
+    calls = []
+
+    def _add_data_to_dataset(self, dataset, *urls, jobs=1, **kwargs):
+        calls.append(jobs)
+        raise FileNotFoundError('Missing {0}'.format(urls[0]))
+
+    monkeypatch.setattr(
+        LocalClient, 'add_data_to_dataset', _add_data_to_dataset
+    )
+
+    monkeypatch.setenv('RENKU_JOBS', '2')
+    result = runner.invoke(cli.cli, ['dataset', 'add', 'dataset', 'unknown'])
+    assert 2 == result.exit_code
+    assert 'Could not process Missing unknown' in result.output
+    assert [2] == calls
+
+    monkeypatch.setenv('RENKU_JOBS', 'auto')
+    with pytest.warns(UserWarning):
+        result = runner.invoke(
+            cli.cli, ['dataset', 'add', 'dataset', 'unknown']
+        )
+    assert 2 == result.exit_code
+    assert [2, os.cpu_count() or 1] == calls
+
+    result = runner.invoke(
+        cli.cli, ['dataset', 'add', 'dataset', '--jobs', '0', 'unknown']
+    )
+    assert 2 == result.exit_code
+    assert 2 == len(calls)
+
+
 def test_repository_file_to_dataset(runner, project, client):
     """Test adding a file from the repository into a dataset."""
     # create a dataset
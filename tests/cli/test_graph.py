@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test provenance graph builder."""
+
+import json
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import attr
+import pytest
+
+from renku.cli import _cache
+from renku.cli._graph import Graph
+from renku.cli._staleness import Staleness
+
+
+def _graph_keys(client, jobs=1):
+    """Build a graph and return keys of its nodes."""
+    graph = Graph(client, jobs=jobs)
+    graph.build()
+    return graph, [(node.commit, node.path) for node in graph.nodes]
+
+
+def test_activity_cache(client, add_sources, run_wc):
+    """Test that activities are loaded from the cache."""
+    source, = add_sources('source.txt')
+    assert 0 == run_wc(source, client.path / 'output.txt')
+
+    graph, keys = _graph_keys(client)
+    commit = client.repo.head.commit
+    record = graph.cache.load(commit)
+    assert record['path'] == graph.activities[commit].path
+    assert 'source.txt' in record['inputs']
+
+    # Cache files are never committed.
+    assert not client.repo.is_dirty(untracked_files=True)
+
+    cached_graph, cached_keys = _graph_keys(client)
+    assert keys == cached_keys
+    status = graph.build_status()
+    cached_status = cached_graph.build_status()
+    assert status['up-to-date'] == cached_status['up-to-date']
+
+
+def test_incremental_status(client, add_sources, run_wc):
+    """Test that only files depending on modified paths are evaluated."""
+    source, other = add_sources('source.txt', 'other.txt')
+    assert 0 == run_wc(source, client.path / 'output.txt')
+    assert 0 == run_wc(other, client.path / 'other_output.txt')
+
+    status = Graph(client).build_status()
+    assert {'output.txt', 'other_output.txt'} == set(status['up-to-date'])
+    stored = json.loads((client.cache_path / 'status.json').read_text())
+    assert client.repo.head.commit.hexsha == stored['revision']
+
+    source.write_text('22')
+    client.repo.git.add('--all')
+    client.repo.index.commit('Modified source.txt')
+
+    status = Graph(client).build_status()
+    assert {'other_output.txt'} == set(status['up-to-date'])
+    assert {'output.txt'} == set(status['outdated'])
+
+    (client.cache_path / 'status.json').unlink()
+    full_status = Graph(client).build_status()
+    assert full_status['up-to-date'] == status['up-to-date']
+    assert {
+        key: {(node.path, node.commit)
+              for node in value}
+        for key, value in full_status['outdated'].items()
+    } == {
+        key: {(node.path, node.commit)
+              for node in value}
+        for key, value in status['outdated'].items()
+    }
+
+
+def test_status_follows_index(client, add_sources, run_wc):
+    """Test that the stored status reflects the index and working tree."""
+    source, other = add_sources('source.txt', 'other.txt')
+    assert 0 == run_wc(source, client.path / 'output.txt')
+    assert 0 == run_wc(other, client.path / 'other_output.txt')
+    assert not Graph(client).build_status()['deleted']
+
+    def _full_status():
+        """Build the status without the stored one and keep it."""
+        stored = client.cache_path / 'status.json'
+        content = stored.read_text()
+        stored.unlink()
+        status = Graph(client).build_status()
+        stored.write_text(content)
+        return status
+
+    # Removal is staged without a commit.
+    client.repo.git.rm('source.txt')
+    status = Graph(client).build_status()
+    assert {'source.txt'} == set(status['deleted'])
+    assert set(_full_status()['deleted']) == set(status['deleted'])
+    assert _full_status()['up-to-date'] == status['up-to-date']
+
+    client.repo.git.reset('HEAD', 'source.txt')
+    client.repo.git.checkout('source.txt')
+    assert not Graph(client).build_status()['deleted']
+
+    # Files missing in the index are checked in the working tree.
+    client.repo.git.rm('--cached', 'other.txt')
+    assert not Graph(client).build_status()['deleted']
+    other.unlink()
+    status = Graph(client).build_status()
+    assert {'other.txt'} == set(status['deleted'])
+    assert set(_full_status()['deleted']) == set(status['deleted'])
+    other.write_text('1')
+    assert not Graph(client).build_status()['deleted']
+
+
+def test_staleness_long_chain():
+    """Test that staleness is propagated through long pipelines."""
+
+    @attr.s
+    class Node(object):
+        _id = attr.ib()
+        parents = attr.ib(default=())
+        modified = attr.ib(default=False)
+
+    @attr.s
+    class FakeGraph(object):
+        def latest(self, node):
+            return node.modified
+
+        def parents(self, node):
+            return list(node.parents)
+
+    source = Node('source', modified=True)
+    other = Node('other', modified=True)
+    node = source
+    for index in range(5 * sys.getrecursionlimit()):
+        node = Node(str(index), parents=[node])
+
+    staleness = Staleness(FakeGraph())
+    assert [source] == staleness.reasons(node)
+    assert [other] == staleness.reasons(other)
+    assert [] == staleness.reasons(Node('fresh'))
+    assert [source, other] == staleness.reasons(
+        Node('both', parents=[node, other])
+    )
+
+    # Nodes of the chain share one set of reasons.
+    assert 4 == len(staleness._interned)
+
+
+def test_concurrent_activities(
+    client, run, add_sources, run_wc, monkeypatch
+):
+    """Test that concurrent processing builds the same graph."""
+    outputs = []
+    for index in range(3):
+        source, = add_sources('source_{0}.txt'.format(index))
+        output = client.path / 'output_{0}.txt'.format(index)
+        assert 0 == run_wc(source, output)
+        outputs.append(output.name)
+
+    for name in ('final.txt', 'final_copy.txt'):
+        final = client.path / name
+        assert 0 == run(args=('run', 'cat') + tuple(outputs), stdout=final)
+
+    executors = []
+
+    def _executor(*args, **kwargs):
+        executors.append(ThreadPoolExecutor(*args, **kwargs))
+        return executors[-1]
+
+    monkeypatch.setattr(_cache, 'ThreadPoolExecutor', _executor)
+
+    graph, keys = _graph_keys(client)
+    shutil.rmtree(str(client.cache_path))
+    concurrent_graph, concurrent_keys = _graph_keys(client, jobs=4)
+
+    assert keys == concurrent_keys
+    assert list(graph.activities) == list(concurrent_graph.activities)
+
+    # Workers only read from Git and definitions are parsed by the caller.
+    threads = set()
+    load = _cache.yaml.load
+
+    def _load(*args, **kwargs):
+        threads.add(threading.current_thread())
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(_cache.yaml, 'load', _load)
+
+    # One pool reads all levels and it is stopped after the build.
+    shutil.rmtree(str(client.cache_path))
+    del executors[:]
+    graph = Graph(client, jobs=4)
+    graph.build(paths=['final.txt', 'final_copy.txt'])
+    assert 1 == len(executors)
+    assert graph.cache._executor is None
+    assert {threading.current_thread()} == threads
+
+
+def test_invalid_jobs(client, monkeypatch):
+    """Test that an invalid number of jobs falls back to the default."""
+    monkeypatch.setenv('RENKU_JOBS', 'auto')
+    with pytest.warns(UserWarning):
+        assert Graph(client).jobs >= 1
+
+    monkeypatch.setenv('RENKU_JOBS', '3')
+    assert 3 == Graph(client).jobs
+
+
+def test_status_paths(client, run, add_sources, run_wc):
+    """Test that status is limited to the given paths."""
+    source, other = add_sources('source.txt', 'other.txt')
+    output = client.path / 'output.txt'
+    other_output = client.path / 'other_output.txt'
+    assert 0 == run_wc(source, output)
+    assert 0 == run_wc(other, other_output)
+
+    source.write_text('22')
+    client.repo.git.add('--all')
+    client.repo.index.commit('Modified source.txt')
+
+    graph = Graph(client)
+    status = graph.build_status(paths=[str(other_output)])
+    assert {'other_output.txt'} == set(status['up-to-date'])
+    assert not status['outdated']
+    # The lineage of output.txt is not inspected.
+    assert 'output.txt' not in {node.path for node in graph.nodes}
+
+    assert 0 == run(args=('status', str(other_output)))
+    assert 1 == run(args=('status', str(output)))
+
+
+def test_streaming_export(client, run, add_sources, run_wc):
+    """Test that streamed formats describe the same graph."""
+    from pyld import jsonld
+    from rdflib import ConjunctiveGraph
+    from rdflib.compare import isomorphic
+    from rdflib.plugin import Parser, register
+
+    from renku.cli._format.graph import _jsonld
+    from renku.models._jsonld import asjsonld
+    from renku.models._rdf import expand
+
+    source, = add_sources('source.txt')
+    output = client.path / 'output.txt'
+    assert 0 == run_wc(source, output)
+
+    graph = Graph(client)
+    graph.build(paths=[str(output)])
+
+    def normalize(data):
+        return jsonld.normalize(
+            data, {
+                'algorithm': 'URDNA2015',
+                'format': 'application/n-quads'
+            }
+        )
+
+    base = client.path.as_uri() + '/'
+    for activity in graph.activities.values():
+        data = asjsonld(activity)
+        assert normalize(jsonld.expand(data, {'base': base})) == normalize(
+            expand(data, base=base)
+        )
+
+    quads = client.path.parent / 'graph.nq'
+    assert 0 == run(args=('log', '--format', 'nq', str(output)), stdout=quads)
+    register('json-ld', Parser, 'rdflib_jsonld.parser', 'JsonLDParser')
+    expected = ConjunctiveGraph().parse(
+        data=_jsonld(graph, 'expand'), format='json-ld'
+    )
+    assert isomorphic(
+        expected,
+        ConjunctiveGraph().parse(data=quads.read_text(), format='nquads')
+    )
+
+
+def test_ascii_lines_are_lazy(client, add_sources, run_wc, monkeypatch):
+    """Test that first lines are rendered before annotating all nodes."""
+    from renku.cli import _echo
+    from renku.cli._ascii import DAG
+    from renku.cli._format.graph import ascii
+
+    source, = add_sources('source.txt')
+    for index in range(3):
+        output = client.path / 'output_{0}.txt'.format(index)
+        assert 0 == run_wc(source, output)
+        source = output
+
+    graph = Graph(client)
+    graph.build(paths=[str(source)])
+
+    annotated = []
+    prefetch_latest = graph.prefetch_latest
+
+    def _prefetch_latest(nodes):
+        annotated.extend(nodes)
+        return prefetch_latest(nodes)
+
+    monkeypatch.setattr(graph, 'prefetch_latest', _prefetch_latest)
+
+    lines = iter(DAG(graph, batch_size=1))
+    first = next(lines)
+    assert 1 == len(annotated)
+
+    rest = list(lines)
+    assert len(list(graph.nodes)) == len(annotated)
+    assert str(DAG(graph)) == '\n'.join([first] + rest)
+
+    # The pager receives a generator function instead of the whole text.
+    pages = []
+    monkeypatch.setattr(_echo, 'echo_via_pager', pages.append)
+    ascii(graph)
+    assert str(DAG(graph)) == ''.join(pages[0]())
+
+
+@pytest.mark.parametrize(
+    'identifier', ['commit/abc', '.renku/workflow', './a/b', '../up', '/abs']
+)
+def test_expand_relative_iris(identifier):
+    """Test that relative IRIs are resolved like in pyld."""
+    from pyld import jsonld
+
+    from renku.models._rdf import expand
+
+    base = 'file:///tmp/project/'
+    data = {
+        '@context': {
+            'prov': 'http://www.w3.org/ns/prov#',
+            'used': {
+                '@id': 'prov:used',
+                '@type': '@id',
+            },
+        },
+        '@id': identifier,
+        '@type': 'prov:Activity',
+        'used': identifier,
+    }
+
+    assert jsonld.expand(data, {'base': base}) == expand(data, base=base)
+    # Relative IRIs are kept if there is no base.
+    assert identifier == expand(data)[0]['@id']
+
+
+def test_dot_formats(client, run, add_sources, run_wc):
+    """Test that dot graphs are rendered from the provenance graph."""
+    source, = add_sources('source.txt')
+    source_commit = client.repo.head.commit.hexsha[:5]
+    output = client.path / 'output.txt'
+    assert 0 == run_wc(source, output)
+    commit = client.repo.head.commit.hexsha[:5]
+
+    simple = client.path.parent / 'simple.dot'
+    assert 0 == run(
+        args=('log', '--format', 'dot', str(output)), stdout=simple
+    )
+    lines = simple.read_text().splitlines()
+    assert '\t"{0}:/source.txt" -> "{1}:" [label="input_stdin"] '.format(
+        source_commit, commit
+    ) in lines
+    assert '\t"{0}:" -> "{0}:/output.txt" [label="output_stdout"] '.format(
+        commit
+    ) in lines
+
+    full = client.path.parent / 'full.dot'
+    assert 0 == run(
+        args=('log', '--format', 'dot-full', str(output)), stdout=full
+    )
+    content = full.read_text()
+    assert 'prov:qualifiedUsage' in content
+    assert '<b>rdf:type</b>' in content
+    assert content.endswith('}\n')
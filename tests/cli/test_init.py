@@ -129,3 +129,19 @@ def test_init_force_in_empty_dir(isolated_runner):
     assert not new_project.exists()
     result = runner.invoke(cli.cli, ['init', '--force', 'test-new-project'])
     assert 0 == result.exit_code
+
+
+def test_init_force_on_renku_project(isolated_runner):
+    """Run init --force on an existing project from its metadata commit."""
+    import git
+
+    runner = isolated_runner
+
+    result = runner.invoke(cli.cli, ['init', '-S'])
+    assert 0 == result.exit_code
+    commit = git.Repo('.').head.commit
+
+    result = runner.invoke(cli.cli, ['init', '-S', '--force'])
+    assert 0 == result.exit_code
+    assert 'renku/init/{0}'.format(commit) in result.output
+    assert 'renku/init/root' not in result.output
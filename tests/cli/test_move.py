@@ -67,6 +67,51 @@ def test_move_dataset_file(tmpdir, runner, client):
     assert 0 == result.exit_code
 
 
+def test_move_loads_changed_datasets(tmpdir, runner, client, monkeypatch):
+    """Test that only datasets with moved files are loaded."""
+    from renku.api.datasets import DatasetsApiMixin
+
+    for name in ('testing', 'other'):
+        result = runner.invoke(cli.cli, ['dataset', 'create', name])
+        assert 0 == result.exit_code
+
+        source = tmpdir.join(name)
+        source.write(name)
+        result = runner.invoke(
+            cli.cli,
+            ['dataset', 'add', name, source.strpath],
+            catch_exceptions=False,
+        )
+        assert 0 == result.exit_code
+
+    result = runner.invoke(cli.cli, ['doctor'], catch_exceptions=False)
+    assert 0 == result.exit_code
+
+    loaded = []
+    load_dataset = DatasetsApiMixin.load_dataset
+
+    def _load_dataset(self, path):
+        loaded.append(path.parent.name)
+        return load_dataset(self, path)
+
+    monkeypatch.setattr(DatasetsApiMixin, 'load_dataset', _load_dataset)
+
+    src = os.path.join('data', 'testing', 'testing')
+    dst = os.path.join('data', 'testing', 'moved')
+    result = runner.invoke(cli.cli, ['mv', src, dst], catch_exceptions=False)
+    assert 0 == result.exit_code
+
+    result = runner.invoke(cli.cli, ['doctor'], catch_exceptions=False)
+    assert 0 == result.exit_code
+
+    with client.with_dataset('testing') as dataset:
+        identifier = dataset.identifier.hex
+        assert ['moved'] == [os.path.basename(f) for f in dataset.files]
+
+    # The moved dataset is loaded to be renamed and after it is written.
+    assert [identifier, identifier] == loaded
+
+
 @pytest.mark.parametrize(
     'destination',
     (
@@ -44,3 +44,22 @@ def test_limit_log(runner, project, run):
     assert result.exit_code == 0
     assert data.name in result.output
     assert output.name not in result.output
+
+
+def test_range_graph(client, run):
+    """Test that only commits in the range are processed."""
+    from renku.cli._graph import Graph
+
+    data = client.path / 'data.txt'
+    output = client.path / 'output.txt'
+
+    assert 0 == run(args=('run', 'echo', 'hello'), stdout=data)
+    assert 0 == run(args=('run', 'wc', '-c'), stdin=data, stdout=output)
+
+    graph = Graph(client)
+    graph.build(revision='HEAD^..', paths=[str(output)])
+    assert [client.repo.head.commit] == list(graph.activities)
+
+    graph = Graph(client)
+    graph.build(revision='HEAD~2..', paths=[str(output)])
+    assert 2 == len(graph.activities)
@@ -47,3 +47,63 @@ def test_show_outputs_with_directory(runner, client, run):
     result = runner.invoke(cli.cli, cmd + ['output/foo', 'output/bar'])
     assert 0 == result.exit_code
     assert {'output'} == set(result.output.strip().split('\n'))
+
+
+def test_show_outputs_from_index(runner, client, run):
+    """Outputs are read from the index updated with new commits."""
+    assert 0 == run(args=('run', 'touch', 'first'))
+
+    result = runner.invoke(cli.cli, ['show', 'outputs'])
+    assert 0 == result.exit_code
+    assert 'first\n' == result.output
+    assert (client.cache_path / 'outputs.json').exists()
+
+    assert 0 == run(args=('run', 'touch', 'second'))
+
+    result = runner.invoke(cli.cli, ['show', 'outputs'])
+    assert 0 == result.exit_code
+    assert {'first', 'second'} == set(result.output.split())
+
+    client.repo.git.rm('first')
+    client.repo.index.commit('Removed first')
+
+    result = runner.invoke(cli.cli, ['show', 'outputs'])
+    assert 0 == result.exit_code
+    assert 'second\n' == result.output
+
+    result = runner.invoke(cli.cli, ['show', 'outputs', 'second'])
+    assert 0 == result.exit_code
+
+    (client.path / 'source').write_text('source')
+    result = runner.invoke(cli.cli, ['show', 'outputs', 'second', 'source'])
+    assert 1 == result.exit_code
+    assert 'second\n' == result.output
+
+
+def test_show_outputs_deleted_directory(runner, client, run):
+    """Deleted output directories are removed from the index."""
+    assert 0 == run(
+        args=(
+            'run', 'bash', '-c', 'mkdir "$0"; touch "$0/foo" "$0/bar"',
+            'output'
+        )
+    )
+    assert 0 == run(args=('run', 'touch', 'other'))
+
+    result = runner.invoke(cli.cli, ['show', 'outputs'])
+    assert 0 == result.exit_code
+    assert {'output', 'other'} == set(result.output.split())
+
+    client.repo.git.rm('output/foo')
+    client.repo.index.commit('Removed foo')
+
+    result = runner.invoke(cli.cli, ['show', 'outputs'])
+    assert 0 == result.exit_code
+    assert {'output', 'other'} == set(result.output.split())
+
+    client.repo.git.rm('output/bar')
+    client.repo.index.commit('Removed bar')
+
+    result = runner.invoke(cli.cli, ['show', 'outputs'])
+    assert 0 == result.exit_code
+    assert 'other\n' == result.output
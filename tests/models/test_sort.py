@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Topological sort tests."""
+
+import sys
+
+import pytest
+
+from renku import errors
+from renku.models._sort import topological
+
+
+@pytest.mark.parametrize(
+    'nodes, key, order', [
+        ({
+            'c': ['b'],
+            'b': ['a'],
+            'd': ['a']
+        }, None, ['c', 'b', 'd', 'a']),
+        ({
+            'c': ['b'],
+            'b': ['a'],
+            'd': ['a']
+        }, {
+            'c': 1,
+            'b': 2,
+            'd': 0,
+            'a': 0
+        }.get, ['d', 'c', 'b', 'a']),
+        ({
+            'a': [],
+            'b': []
+        }, None, ['a', 'b']),
+    ]
+)
+def test_topological(nodes, key, order):
+    """Test stable ordering of nodes."""
+    assert order == topological(nodes, key=key)
+
+
+def test_topological_long_chain():
+    """Test sorting of a chain longer than the recursion limit."""
+    size = 10 * sys.getrecursionlimit()
+    nodes = {index: [index - 1] for index in range(1, size)}
+    assert list(reversed(range(size))) == topological(nodes)
+
+
+def test_topological_cycle():
+    """Test that nodes on a cycle are reported."""
+    with pytest.raises(errors.CyclicDependency) as exc_info:
+        topological({'x': ['a'], 'a': ['b'], 'b': ['c'], 'c': ['b']})
+
+    assert ['b', 'c'] == exc_info.value.nodes
@@ -25,6 +25,7 @@ import shutil
 import subprocess
 import sys
 
+import click
 import git
 import pytest
 import yaml
@@ -49,6 +50,79 @@ def test_help(arg, runner):
     assert 'Show this message and exit.' in result.output
 
 
+def test_lazy_subcommands():
+    """Test that subcommands are not imported at startup."""
+    code = 'import sys, renku.cli; print("\\n".join(sys.modules))'
+    modules = set(
+        subprocess.check_output([sys.executable, '-c', code]).decode().split()
+    )
+
+    assert 'renku.cli' in modules
+    assert not modules & {
+        'cwltool',
+        'filelock',
+        'pyld',
+        'rdflib',
+        'renku.cli._graph',
+        'renku.cli.dataset',
+        'renku.cli.run',
+        'renku.cli.status',
+        'requests',
+        'werkzeug',
+    }
+
+    ctx = click.Context(cli.cli)
+    for name in cli.cli.list_commands(ctx):
+        assert name == cli.cli.get_command(ctx, name).name
+
+
+def test_lazy_subcommands_help():
+    """Test that the help message does not import subcommands."""
+    code = (
+        'import sys, renku.cli\n'
+        'try:\n'
+        '    renku.cli.cli.main(args=["--help"], prog_name="renku")\n'
+        'except SystemExit:\n'
+        '    print("\\n".join(sys.modules))'
+    )
+    output = subprocess.check_output([sys.executable, '-c', code]).decode()
+    modules = set(output.split())
+
+    assert 'Handle datasets.' in output
+    assert not modules & {'rdflib', 'renku.cli.dataset'}
+
+    # Help read from the source matches help of imported subcommands.
+    ctx = click.Context(cli.cli)
+    for name in cli.cli.lazy_commands:
+        help = click.utils.make_default_short_help(cli.cli.lazy_help(name))
+        command = cli.cli.get_command(ctx, name)
+        assert help and command.get_short_help_str() == help
+
+
+def test_import_time():
+    """Test that startup does not pay for importing heavy dependencies."""
+    code = (
+        'import importlib, sys, time\n'
+        'start = time.process_time()\n'
+        'import renku.cli\n'
+        'for name in sys.argv[1:]:\n'
+        '    importlib.import_module(name)\n'
+        'print(time.process_time() - start)\n'
+    )
+
+    def measure(*modules):
+        """Return the shortest time of a cold import."""
+        return min(
+            float(
+                subprocess.check_output([sys.executable, '-c', code] +
+                                        list(modules))
+            ) for _ in range(5)
+        )
+
+    deferred = ('filelock', 'pyld.jsonld', 'requests', 'werkzeug.utils')
+    assert 1.25 * measure() < measure(*deferred)
+
+
 def test_config_path(runner):
     """Test config path."""
     from renku.cli._config import RENKU_HOME
@@ -372,6 +446,41 @@ def test_show_inputs(tmpdir_factory, project, runner, run):
             } == set(result.output.strip().split('\n'))
 
 
+def test_shared_subclients(tmpdir_factory, project, run):
+    """Test that commits share clients of submodules."""
+    from renku.api import LocalClient
+
+    second_project = Path(str(tmpdir_factory.mktemp('second_project')))
+    assert 0 == run(args=('init', str(second_project)))
+
+    woop = second_project / 'woop'
+    woop.write_text('woop')
+
+    second_repo = git.Repo(str(second_project))
+    second_repo.git.add('--all')
+    second_repo.index.commit('Added woop file')
+
+    assert 0 == run(args=('dataset', 'create', 'foo'))
+    assert 0 == run(args=('dataset', 'add', 'foo', str(woop)))
+
+    imported_woop = Path(project) / 'data' / 'foo' / woop.name
+    assert 0 == run(args=('run', 'touch', 'output'))
+
+    client = LocalClient(project)
+    previous, head = client.repo.commit('HEAD~'), client.repo.commit('HEAD')
+    assert 1 == len(client.subclients(head))
+    assert {id(subclient)
+            for subclient in client.subclients(previous).values()} == {
+                id(subclient)
+                for subclient in client.subclients(head).values()
+            }
+
+    path = str(imported_woop.relative_to(Path(project)))
+    resolved = client.resolve_in_submodules(head, path)
+    assert resolved[0] in client.subclients(head).values()
+    assert resolved is client.resolve_in_submodules(head, path)
+
+
 def test_configuration_of_external_storage(isolated_runner, monkeypatch):
     """Test the LFS requirement for renku run."""
     runner = isolated_runner
@@ -29,6 +29,78 @@ def test_local_client(tmpdir):
     assert client.repo is None
 
 
+def test_init_submodules(client, monkeypatch):
+    """Test that submodules are updated only when their state changes."""
+    from renku.api import repository
+    from renku.api.client import LocalClient
+
+    calls = []
+    check_output = repository.check_output
+
+    def _check_output(*args, **kwargs):
+        calls.append(args)
+        return check_output(*args, **kwargs)
+
+    monkeypatch.setattr(repository, 'check_output', _check_output)
+
+    LocalClient(client.path)
+    assert not calls
+
+    gitmodules = client.path / '.gitmodules'
+    gitmodules.write_text('# no submodules\n')
+
+    LocalClient(client.path)
+    assert 1 == len(calls)
+
+    LocalClient(client.path)
+    assert 1 == len(calls)
+
+    gitmodules.write_text('# still no submodules\n')
+    LocalClient(client.path)
+    assert 2 == len(calls)
+
+
+def test_init_submodules_gitlinks(client, monkeypatch):
+    """Test that submodules are updated only when their commits change."""
+    from renku.api import repository
+    from renku.api.client import LocalClient
+
+    calls = []
+    monkeypatch.setattr(
+        repository, 'check_output', lambda *args, **kwargs: calls.append(args)
+    )
+
+    def _commit_gitlink(hexsha):
+        """Record the submodule commit in a new commit."""
+        client.repo.git.update_index(
+            '--add', '--cacheinfo', '160000,{0},sub'.format(hexsha)
+        )
+        client.repo.index.commit('Updated sub')
+
+    first = client.repo.head.commit.hexsha
+    (client.path / '.gitmodules').write_text(
+        '[submodule "sub"]\n\tpath = sub\n\turl = ./sub\n'
+    )
+    (client.path / 'sub' / '.git').mkdir(parents=True)
+    client.repo.git.add('.gitmodules')
+    _commit_gitlink(first)
+
+    LocalClient(client.path)
+    assert 1 == len(calls)
+
+    # Commits which do not move submodules do not update them.
+    (client.path / 'file').write_text('file')
+    client.repo.git.add('file')
+    client.repo.index.commit('Added file')
+
+    LocalClient(client.path)
+    assert 1 == len(calls)
+
+    _commit_gitlink(client.repo.head.commit.hexsha)
+    LocalClient(client.path)
+    assert 2 == len(calls)
+
+
 @pytest.mark.parametrize(
     'paths, ignored', (
         (['.renku.lock'], ['.renku.lock']),
@@ -39,3 +111,71 @@ def test_local_client(tmpdir):
 def test_ignored_paths(paths, ignored, client):
     """Test resolution of ignored paths."""
     assert client.find_ignored_paths(*paths) == ignored
+
+
+def test_find_previous_commit(client):
+    """Test resolution of the latest commits modifying paths."""
+    repo = client.repo
+
+    def commit(path, content):
+        """Commit the content to the given path."""
+        path = client.path / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        repo.git.add('--all')
+        return repo.index.commit('Updated {0}'.format(path.name))
+
+    first = commit('data/a.txt', '1')
+    second = commit('data/sub/b.txt', '2')
+    third = commit('data/a.txt', '3')
+
+    assert third == client.find_previous_commit('data/a.txt')
+    assert second == client.find_previous_commit('data/sub/b.txt')
+    assert second == client.find_previous_commit('data/sub/')
+    assert third == client.find_previous_commit('data')
+    assert first == client.find_previous_commit(
+        'data/a.txt', revision='{0}^'.format(third)
+    )
+    assert second == client.find_previous_commit(
+        'data', revision=second.hexsha
+    )
+
+    with pytest.raises(KeyError):
+        client.find_previous_commit('data/sub/b.txt', revision=first)
+
+    with pytest.raises(KeyError):
+        client.find_previous_commit('missing.txt')
+
+    # Absolute paths are resolved relative to the repository.
+    assert third == client.find_previous_commit(str(client.path / 'data'))
+    with pytest.raises(ValueError):
+        client.find_previous_commit(str(client.path.parent / 'data'))
+
+
+def test_git_reader(client):
+    """Test reading of commits and files using long-lived Git processes."""
+    from renku.api._git import GIT_CALLS
+
+    repo = client.repo
+    (client.path / 'a.txt').write_text('1')
+    (client.path / 'b.txt').write_text('2')
+    repo.git.add('--all')
+    first = repo.index.commit('Created files')
+
+    repo.git.mv('a.txt', 'renamed.txt')
+    repo.git.rm('b.txt')
+    second = repo.index.commit('Renamed a.txt')
+
+    reader = client.git_reader
+    calls = sum(GIT_CALLS.values())
+    assert {'renamed.txt': 'R100', 'b.txt': 'D'} == reader.changes(second)
+    assert {'a.txt', 'b.txt'} <= set(reader.changes(first))
+    assert b'1' == reader.read(second, 'renamed.txt')
+    assert b'2' == reader.read(first, 'b.txt')
+
+    with pytest.raises(KeyError):
+        reader.read(second, 'b.txt')
+
+    # One log, one cat-file process and four requests sent to it.
+    assert calls + 6 == sum(GIT_CALLS.values())
+    assert second == client.find_previous_commit('a.txt')
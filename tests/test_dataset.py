@@ -17,15 +17,20 @@
 # limitations under the License.
 """Dataset tests."""
 
+import base64
+import hashlib
 import os
 import shutil
 import stat
+import threading
 from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import git
 import pytest
 import yaml
 
+from renku import errors
 from renku.models.datasets import Author, Dataset, DatasetFile
 
 
@@ -114,6 +119,93 @@ def test_data_add_recursive(directory_tree, client):
     assert _key(client, d, 'dir2/file2') in d.files
 
 
+@pytest.mark.parametrize('name', ['dataset', 'group/dataset'])
+def test_data_add_tracks_once(client, tmpdir, monkeypatch, name):
+    """Test that imported files are tracked in storage with one command."""
+    from renku.api import storage
+    from renku.api.storage import StorageApiMixin
+
+    calls = []
+
+    def _call(args, **kwargs):
+        calls.append(args)
+        return 0
+
+    monkeypatch.setattr(storage, 'call', _call)
+    monkeypatch.setattr(
+        StorageApiMixin, 'external_storage_installed', True
+    )
+    monkeypatch.setattr(client, 'use_external_storage', True)
+
+    source = tmpdir.mkdir('source')
+    source.join('single').write('0')
+    source.mkdir('many')
+    for index in range(3):
+        source.join('many', str(index)).write(str(index))
+    source.mkdir('notebooks').join('notebook.ipynb').write('{}')
+
+    with client.with_dataset(name) as d:
+        d.authors = [{
+            'name': 'me',
+            'email': 'me@example.com',
+        }]
+        client.add_data_to_dataset(d, source.strpath)
+
+    assert 1 == len(calls)
+    assert StorageApiMixin._CMD_STORAGE_TRACK + [
+        'data/{0}/source/many/0'.format(name),
+        'data/{0}/source/many/1'.format(name),
+        'data/{0}/source/many/2'.format(name),
+        'data/{0}/source/single'.format(name),
+    ] == calls[0]
+
+
+def test_data_add_tracks_files(client, tmpdir, monkeypatch):
+    """Test that only imported files are tracked and notebooks are not."""
+    from renku.api import storage
+    from renku.api.storage import StorageApiMixin
+
+    def _call(args, **kwargs):
+        """Write patterns to .gitattributes like the storage command."""
+        with (client.path / '.gitattributes').open('a') as fp:
+            for pattern in args[len(StorageApiMixin._CMD_STORAGE_TRACK):]:
+                fp.write('{0} filter=lfs diff=lfs merge=lfs -text\n'.format(
+                    pattern
+                ))
+        return 0
+
+    monkeypatch.setattr(storage, 'call', _call)
+    monkeypatch.setattr(
+        StorageApiMixin, 'external_storage_installed', True
+    )
+    monkeypatch.setattr(client, 'use_external_storage', True)
+
+    source = tmpdir.mkdir('source')
+    for index in range(2):
+        source.join(str(index)).write(str(index))
+    source.mkdir('notebooks').join('notebook.ipynb').write('{}')
+
+    with client.with_dataset('dataset') as d:
+        d.authors = [{
+            'name': 'me',
+            'email': 'me@example.com',
+        }]
+        client.add_data_to_dataset(d, source.strpath)
+
+    later = 'data/dataset/source/later.ipynb'
+    (client.path / later).write_text('{}')
+    paths = [
+        'data/dataset/source/0',
+        'data/dataset/source/1',
+        'data/dataset/source/notebooks/notebook.ipynb',
+        later,
+    ]
+    attrs = client.find_attr(*paths)
+    assert ['lfs', 'lfs', None, None] == [
+        attrs.get(path, {}).get('filter') for path in paths
+    ]
+
+
 def dataset_serialization(client, dataset, data_file):
     """Test deserializing a dataset object."""
     with open(dataset.path / 'metadata.yml', 'r') as f:
@@ -151,6 +243,34 @@ def test_git_repo_import(client, dataset, tmpdir, data_repository):
     assert all(x.name in ('me', 'me2') for x in dataset.files[file].authors)
 
 
+def test_git_repo_import_authors(
+    client, dataset, data_repository, monkeypatch
+):
+    """Test that authors of imported files are read from one Git log."""
+    from renku.api import datasets
+
+    calls = []
+    iter_path_authors = datasets.iter_path_authors
+
+    def _iter_path_authors(*args):
+        calls.append(args)
+        return iter_path_authors(*args)
+
+    monkeypatch.setattr(datasets, 'iter_path_authors', _iter_path_authors)
+
+    client.add_data_to_dataset(
+        dataset, os.path.dirname(data_repository.git_dir)
+    )
+
+    assert 1 == len(calls)
+    assert ['me2', 'me'] == [
+        author.name
+        for author in dataset.files[_key(client, dataset, 'file')].authors
+    ]
+    file2 = _key(client, dataset, 'dir2/file2')
+    assert ['me'] == [author.name for author in dataset.files[file2].authors]
+
+
 @pytest.mark.parametrize(
     'authors', [
         [Author(name='me', email='me@example.com')],
@@ -172,3 +292,149 @@ def test_author_parse(authors, data_file):
     # authors must be a set or list of dicts or Author
     with pytest.raises(ValueError):
         f = DatasetFile('file', authors=['name'])
+
+
+def test_dataset_summaries(client, monkeypatch):
+    """Test that summaries of datasets are loaded from cache."""
+    from renku.api import datasets as api_datasets
+
+    author = Author(name='me', email='me@example.com')
+    with client.with_dataset(name='dataset') as dataset:
+        dataset.authors.append(author)
+        dataset.files.update({
+            'file{0}'.format(i): DatasetFile('file{0}'.format(i))
+            for i in range(3)
+        })
+
+    loads = []
+    load = api_datasets.yaml.load
+
+    def _load(*args, **kwargs):
+        loads.append(args)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(api_datasets.yaml, 'load', _load)
+
+    path, summary = next(iter(client.dataset_summaries.items()))
+    assert 'dataset' == summary.name
+    assert [author] == summary.authors
+    assert 3 == summary.files
+    assert 1 == len(loads)
+
+    with path.open('r') as fp:
+        expected = Dataset.from_jsonld(load(fp))
+
+    assert {path: summary} == client.dataset_summaries
+    assert 1 == len(loads)
+
+    # Files are read from the metadata file and not stored in the cache.
+    assert expected == client.datasets[path]
+    assert 2 == len(loads)
+    assert ['datasets.json'] == [
+        child.name for child in client.cache_path.iterdir()
+        if child.name.startswith('datasets')
+    ]
+
+    with client.with_dataset(name='dataset') as dataset:
+        dataset.files.popitem()
+
+    assert 2 == client.dataset_summaries[path].files
+    assert 4 == len(loads)
+    assert 2 == len(client.datasets[path].files)
+    assert 5 == len(loads)
+
+
+@contextmanager
+def _http_server(content, digest=None, interrupt=True):
+    """Serve the content with support for range requests."""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        """Interrupt the first response and answer range requests."""
+
+        def do_GET(self):
+            """Send the whole content or the requested range."""
+            requests.append(dict(self.headers))
+            start = 0
+            if self.headers.get('If-Range') == '"v1"':
+                start = int(self.headers['Range'][6:-1])
+                self.send_response(206)
+                self.send_header(
+                    'Content-Range', 'bytes {0}-{1}/{2}'.format(
+                        start,
+                        len(content) - 1, len(content)
+                    )
+                )
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(len(content) - start))
+            self.send_header('ETag', '"v1"')
+            if digest:
+                self.send_header('Digest', 'SHA-256=' + digest)
+            self.end_headers()
+
+            if interrupt and len(requests) == 1:
+                self.wfile.write(content[:len(content) // 2])
+            else:
+                self.wfile.write(content[start:])
+
+        def log_message(self, *args):
+            """Do not log requests."""
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:{0}/file'.format(server.server_port), requests
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_download_resume(client):
+    """Test that interrupted downloads are resumed."""
+    from renku.api.datasets import DOWNLOAD_CHUNK_SIZE
+
+    content = os.urandom(3 * DOWNLOAD_CHUNK_SIZE)
+    dst = client.path / 'file'
+
+    with _http_server(content) as (url, requests):
+        checksum = client.download(url, dst)
+
+    assert content == dst.read_bytes()
+    assert hashlib.sha256(content).hexdigest() == checksum
+    assert 2 == len(requests)
+    assert 'bytes={0}-'.format(DOWNLOAD_CHUNK_SIZE) == requests[1]['Range']
+    assert not list((client.cache_path / client.DOWNLOADS).iterdir())
+
+
+def test_download_same_url(client, monkeypatch):
+    """Test that a URL added several times is downloaded once."""
+    monkeypatch.setattr(client, 'use_external_storage', False)
+    content = os.urandom(1000)
+
+    with _http_server(content, interrupt=False) as (url, requests):
+        with client.with_dataset('dataset') as d:
+            client.add_data_to_dataset(d, url, url, jobs=2)
+
+    assert 1 == len(requests)
+    assert content == (client.path / 'data' / 'dataset' / 'file').read_bytes()
+    assert [_key(client, d, 'file')] == list(d.files)
+
+
+def test_download_checksum(client):
+    """Test that downloads are verified with the announced digest."""
+    content = os.urandom(1000)
+    digest = base64.b64encode(hashlib.sha256(content).digest()).decode()
+    dst = client.path / 'file'
+
+    with _http_server(content, digest=digest, interrupt=False) as (url, _):
+        client.download(url, dst)
+    assert content == dst.read_bytes()
+
+    digest = base64.b64encode(hashlib.sha256(b'other').digest()).decode()
+    with _http_server(content, digest=digest, interrupt=False) as (url, _):
+        with pytest.raises(errors.DownloadError):
+            client.download(url, client.path / 'other')
+    assert not (client.path / 'other').exists()
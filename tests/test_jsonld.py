@@ -46,3 +46,76 @@ def test_inheritance():
     data = jsonld.asjsonld(WorkflowRun())
     assert set(data['@type']) == types
     assert set(data['@context'].keys()) == context_keys
+
+
+def test_compiled_context():
+    """Test loading of data with a different context."""
+    from renku.models.datasets import Author, Dataset, DatasetFile
+
+    dataset = Dataset(
+        name='demo',
+        authors=[Author(name='A', email='a@example.com')],
+        files={
+            'data/demo/a':
+                DatasetFile(
+                    path='data/demo/a',
+                    url='http://example.com/a',
+                    authors=[Author(name='B', email='b@example.com')],
+                )
+        },
+    )
+    data = jsonld.asjsonld(dataset)
+    data['@context'] = dict(
+        data['@context'],
+        schema='http://schema.org/',
+        title='dcterms:name',
+    )
+    data['title'] = data.pop('name')
+    data['schema:keywords'] = 'ignored'
+
+    jsonld._compiled_contexts.clear()
+    assert dataset == Dataset.from_jsonld(data)
+    assert dataset == Dataset.from_jsonld(data)
+
+    compiled, = jsonld._compiled_contexts.values()
+    assert 'name' == compiled.key('title')
+    assert compiled.key('schema:keywords') is None
+
+
+def test_shared_context():
+    """Test that nested objects share the context of their parents."""
+
+    @jsonld.s(type='foaf:Person', context={'foaf': 'http://xmlns.com/foaf/'})
+    class Person:
+        """Define a person."""
+
+        name = jsonld.ib(context='foaf:name')
+
+    @jsonld.s(type='prov:Entity', context={'prov': 'http://www.w3.org/ns/'})
+    class Entity:
+        """Define an entity with an owner."""
+
+        owner = jsonld.ib(context='prov:wasAttributedTo')
+
+    @jsonld.s(type='foaf:Group', context={'foaf': 'http://xmlns.com/foaf/'})
+    class Group:
+        """Define a group of people."""
+
+        leader = jsonld.ib(context='foaf:leader')
+        entity = jsonld.ib(context='foaf:made')
+        members = jsonld.container.list(
+            Person, context={'@id': 'foaf:member'}
+        )
+
+    person = Person(name='A')
+    group = Group(
+        leader=person, entity=Entity(owner=person), members=[person]
+    )
+    data = jsonld.asjsonld(group)
+
+    assert '@context' not in data['members'][0]
+    assert '@context' not in data['leader']
+    assert '@context' in data['entity']
+    assert '@context' in data['entity']['owner']
+    assert data['@context'] == Group._jsonld_context
+    assert data['@context'] is not Group._jsonld_context